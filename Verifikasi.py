@@ -1,21 +1,34 @@
 import sys
 import os
-import re
 import json
-import pytesseract
+import queue
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import multiprocessing
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from configparser import ConfigParser
 
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QFileDialog, QLabel, QTableWidget, QTableWidgetItem, QMessageBox,
     QHeaderView, QDialog, QLineEdit, QDialogButtonBox,
-    QGridLayout, QAbstractItemView, QMenu
+    QGridLayout, QAbstractItemView, QMenu, QCheckBox, QTableView, QPlainTextEdit
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from PyQt6.QtGui import QColor, QPixmap, QIcon, QAction
-from openpyxl import Workbook
-from openpyxl.styles import Font as ExcelFont, PatternFill, Alignment, Side, Border
-from openpyxl.styles.colors import Color
+from PyQt6.QtCore import Qt, QObject, QTimer, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtGui import QColor, QPixmap, QIcon, QAction, QFontDatabase
+
+import verifikasi_engine
+from verifikasi_engine import (
+    get_resource_path, load_dependencies, configure_tesseract, get_tesseract_cmd, get_ocr_backend_name, unique_display_headers, result_row_texts, evaluate_validation, DEFAULT_VALIDATION_RULES, RESULT_HEADERS, OCR_CACHE_FILE, OCR_CACHE_DEFAULT_MAX_MB, PAGE_TEXT_CACHE_DEFAULT_MAX_MB, JOURNAL_FILE,
+    PIXMAPS_PER_WORKER, ADAPTIVE_DEFAULT_MAX_DPI, create_pixmap_slots,
+    FileResult, FolderManifest, ResultJournal, settings_version, OcrDiskCache, DiagnosisRegion, KeywordMatcher, RuleIndex, TimingsCollector, merge_profiles, init_process_worker, run_pdf_job, run_pdf_job_in_process
+)
+from verifikasi_export import XlsxResultWriter, open_result_writer, rollover_path, text_width
 
 # --- Check for TextWordWrap attribute
 WORD_WRAP_FLAG = 0
@@ -34,8 +47,8 @@ QPushButton { background-color: #30363D; color: #FFFFFF; border: 1px solid #00BF
 QPushButton:hover { background-color: #3B424A; border: 1px solid #4AC8FF; }
 QPushButton:pressed { background-color: #00BFFF; color: #21252B; }
 QPushButton:disabled { background-color: #282C34; color: #636D83; border: 1px solid #282C34; }
-QTableWidget { background-color: #21252B; alternate-background-color: #2A2F36; color: #C8CDD3; gridline-color: #30363D; border: 1px solid #00BFFF; selection-background-color: #00BFFF; selection-color: #21252B; border-radius: 8px; }
-QTableWidget::item { padding: 4px; }
+QTableView { background-color: #21252B; alternate-background-color: #2A2F36; color: #C8CDD3; gridline-color: #30363D; border: 1px solid #00BFFF; selection-background-color: #00BFFF; selection-color: #21252B; border-radius: 8px; }
+QTableView::item { padding: 4px; }
 QHeaderView::section { background-color: #30363D; color: #00BFFF; padding: 6px; border: 1px solid #21252B; font-weight: bold; text-transform: uppercase; }
 QHeaderView::section:horizontal { border-top: 0px solid #21252B; border-bottom: 1px solid #00BFFF; }
 QMessageBox { background-color: #21252B; color: #C8CDD3; font-size: 12px; }
@@ -90,129 +103,139 @@ QScrollBar::add-page:horizontal, QScrollBar::sub-page:horizontal {
 }
 """
 
-def get_resource_path(relative_path):
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-# --- KONSTANTA PENTING ---
-EXTRACTION_KEYWORD_PRIMARY = "Diagnosa"
-REGEX_EXTRACTION_PRIMARY = re.compile(
-    rf"{EXTRACTION_KEYWORD_PRIMARY}(?:\s*Utama|\s*\d\.?)?\s*[:;,-]?\s*(.*?)(?={EXTRACTION_KEYWORD_PRIMARY}(?:\s*Sekunder|\s*\d\.?)?|Validasi hasil|\Z)",
-    re.IGNORECASE | re.DOTALL
-)
-REGEX_SPLIT_DIAGNOSA = re.compile(r"^(\s*([a-zA-Z]\d{2}(?:\.\d{1,2})?))(?:\s*-\s*|\s*)(.*)", re.IGNORECASE)
-
-# --- Kelas Worker untuk Memproses PDF (Berjalan di Thread Terpisah) ---
-class PdfProcessingWorker(QThread):
-    finished = pyqtSignal(str, dict, str, dict, bool)
-    keyword_found_signal = pyqtSignal(str, str, int)
-
-    def __init__(self, pdf_path, texts_to_find_tuples, dpi, validation_rules, code_text):
-        super().__init__()
-        self.pdf_path = pdf_path
-        self.texts_to_find_tuples = texts_to_find_tuples
-        self.dpi = dpi
-        self.validation_rules = validation_rules
-        self.code_text = code_text
-
-    def _get_page_text(self, page, page_num, dpi):
-        page_text_from_pdf = page.get_text()
-        if page_text_from_pdf.strip():
-            return page_text_from_pdf
-        
-        if not pytesseract:
-            return ""
+UI_UPDATE_INTERVAL_MS = 200
+REVERIFY_MESSAGE = ("File di tabel diverifikasi ulang memakai teks halaman yang tersimpan di cache OCR; "
+                    "PDF hanya dibuka jika halaman yang diperlukan belum pernah dibaca atau teksnya tidak tersimpan.")
+
+# --- Penjadwal Pekerjaan dengan Batas Konkurensi ---
+class PdfJobScheduler(QObject):
+    prescan_finished = pyqtSignal(str, str, str, bool)
+    file_finished = pyqtSignal(str, dict, str, dict, bool, list)
+    keyword_found = pyqtSignal(str, str, int)
+    scan_stats = pyqtSignal(str, dict)
+    result_ready = pyqtSignal(object)
+    all_finished = pyqtSignal()
+    _job_done = pyqtSignal(object)
+    _event_received = pyqtSignal(object)
+
+    def __init__(self, max_workers, use_processes=False, ocr_cache=None, parent=None, max_pixmaps=None):
+        super().__init__(parent)
+        self.max_workers = max(1, max_workers)
+        # Batas gambar halaman hasil render di semua worker: memori puncak mengikuti konkurensi, bukan ukuran batch OCR
+        max_pixmaps = max_pixmaps or self.max_workers * PIXMAPS_PER_WORKER
+        self.use_processes = use_processes
+        self.ocr_cache = ocr_cache
+        self.pending_jobs = deque()
+        self.prescanned_paths = set()
+        self.running_count = 0
+        self.cancelled = False
+        self._job_done.connect(self._on_job_done)
+        self._event_received.connect(self._dispatch_event)
+        # Tesseract memakai OpenMP; batasi ke satu thread per proses agar worker tidak saling berebut core
+        if self.max_workers > 1:
+            os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+        if use_processes:
+            mp_context = multiprocessing.get_context("spawn")
+            self._event_queue = mp_context.Queue()
+            self._stop_event = mp_context.Event()
+            tesseract_cmd = get_tesseract_cmd()
+            ocr_cache_settings = (ocr_cache.db_path, ocr_cache.max_bytes, ocr_cache.page_text_max_bytes) if ocr_cache else None
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=mp_context, initializer=init_process_worker,
+                initargs=(tesseract_cmd, ocr_cache_settings, self._event_queue, self._stop_event, get_ocr_backend_name(),
+                          create_pixmap_slots(max_pixmaps, mp_context))
+            )
+            self._event_timer = QTimer(self)
+            self._event_timer.timeout.connect(self._drain_process_events)
+            self._event_timer.start(100)
+        else:
+            self._stop_event = threading.Event()
+            # Semaphore milik penjadwal ini: worker dari batch yang dibatalkan tetap melepas slot ke semaphore-nya sendiri
+            self.pixmap_slots = create_pixmap_slots(max_pixmaps)
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def start(self, jobs):
+        self.pending_jobs.extend(jobs)
+        self._submit_pending()
+        if not self.running_count:
+            self._finish()
+
+    def _submit_pending(self):
+        # Antrian terbatas: hanya max_workers pekerjaan yang diserahkan ke executor pada satu waktu
+        while self.pending_jobs and self.running_count < self.max_workers and not self.cancelled:
+            job = self.pending_jobs.popleft()
+            try:
+                if self.use_processes:
+                    future = self.executor.submit(run_pdf_job_in_process, job)
+                else:
+                    future = self.executor.submit(self._run_job_in_thread, job)
+            except Exception as e:
+                self.file_finished.emit(job['path'], {}, f"Terjadi kesalahan umum saat memproses PDF: {e}", {}, False, [])
+                continue
+            self.running_count += 1
+            future.add_done_callback(lambda done_future, pdf_path=job['path']: self._job_done.emit((pdf_path, done_future)))
+
+    def _run_job_in_thread(self, job):
+        return run_pdf_job(job, self.ocr_cache, self._event_received.emit, self._stop_event.is_set, self.pixmap_slots)
+
+    def _drain_process_events(self):
+        while True:
+            try:
+                event = self._event_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._dispatch_event(event)
 
+    def _dispatch_event(self, event):
+        if self.cancelled:
+            return
+        if event[0] == 'prescan':
+            self._emit_prescan(*event[1:])
+        elif event[0] == 'keyword':
+            self.keyword_found.emit(*event[1:])
+
+    def _emit_prescan(self, pdf_path, code_text, description_text, is_relevant):
+        if pdf_path not in self.prescanned_paths:
+            self.prescanned_paths.add(pdf_path)
+            self.prescan_finished.emit(pdf_path, code_text, description_text, is_relevant)
+
+    def _on_job_done(self, done):
+        pdf_path, future = done
+        self.running_count -= 1
+        if self.cancelled:
+            return
+        if self.use_processes:
+            self._drain_process_events()
         try:
-            zoom = dpi / 72.0
-            matrix = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=matrix)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            osd_data = pytesseract.image_to_osd(img)
-            rotation_angle_match = re.search(r"Rotate: (\d+)", osd_data)
-            if rotation_angle_match:
-                angle = int(rotation_angle_match.group(1))
-                if angle != 0:
-                    img = img.rotate(-angle, expand=True)
-            config_ocr = '--psm 3 -l eng+ind'
-            page_text_from_ocr = pytesseract.image_to_string(img, config=config_ocr)
-            return page_text_from_ocr
-        except pytesseract.TesseractNotFoundError:
-            raise pytesseract.TesseractNotFoundError("Mesin Tesseract OCR tidak ditemukan.")
+            file_result = future.result()
+            self._emit_prescan(pdf_path, file_result.code, file_result.description, file_result.relevant)
+            self.scan_stats.emit(pdf_path, file_result.stats)
+            if file_result.relevant:
+                self.file_finished.emit(pdf_path, file_result.results, file_result.error, file_result.pages,
+                                        file_result.ringkasan, file_result.matched_rules)
         except Exception as e:
-            if "Too few characters" in str(e) or "Error during processing." in str(e) or "Invalid resolution" in str(e):
-                return ""
-            else:
-                raise Exception(f"Error serius saat OCR di halaman {page_num + 1}: {e}")
+            file_result = FileResult(pdf_path, relevant=True, error=f"Terjadi kesalahan umum saat memproses PDF: {e}")
+            self.file_finished.emit(pdf_path, {}, file_result.error, {}, False, [])
+        self.result_ready.emit(file_result)
+        self._submit_pending()
+        if not self.running_count and not self.pending_jobs:
+            self._finish()
+
+    def _finish(self):
+        if self.use_processes:
+            self._event_timer.stop()
+        self.executor.shutdown(wait=False)
+        self.all_finished.emit()
+
+    def cancel(self):
+        self.cancelled = True
+        self.pending_jobs.clear()
+        self._stop_event.set()
+        if self.use_processes:
+            self._event_timer.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
 
-    def run(self):
-        grouped_search_texts = {}
-        for search_text, display_text in self.texts_to_find_tuples:
-            grouped_search_texts.setdefault(display_text, []).append(search_text)
-
-        results = {display_text: False for display_text in grouped_search_texts.keys()}
-        found_page_numbers = {display_text: -1 for display_text in grouped_search_texts.keys()}
-
-        error_message = ""
-        document = None
-        found_ringkasan_keyword = False
-        
-        try:
-            document = fitz.open(self.pdf_path)
-            
-            start_page_for_keywords = 0
-            
-            for page_num in range(document.page_count):
-                page_content = self._get_page_text(document.load_page(page_num), page_num, self.dpi)
-                if re.search(r'\b(kriteria\s+discharge\s+planing|rm\s*29|permintaan\s+rawat\s+inap|discharge\s+planing)\b', page_content.lower(), re.IGNORECASE | re.DOTALL):
-                    start_page_for_keywords = page_num
-                    found_ringkasan_keyword = True
-                    break
-            
-            if not found_ringkasan_keyword:
-                self.finished.emit(self.pdf_path, {}, "Tidak Lulus: 'Permintaan Rawat Inap' tidak ditemukan.", {}, found_ringkasan_keyword)
-                return
-
-            for display_text, search_texts in grouped_search_texts.items():
-                for page_num in range(start_page_for_keywords, document.page_count):
-                    page_content = self._get_page_text(document.load_page(page_num), page_num, self.dpi)
-                    found_on_page = False
-                    for search_text in search_texts:
-                        if search_text.lower() in page_content.lower():
-                            results[display_text] = True
-                            found_page_numbers[display_text] = page_num + 1
-                            self.keyword_found_signal.emit(self.pdf_path, display_text, page_num + 1)
-                            found_on_page = True
-                            break
-                    if found_on_page:
-                        break
-
-            if self.code_text != "Tidak Ditemukan":
-                code_text_lower = self.code_text.lower()
-                for diag_keyword_regex, must_have_keyword in self.validation_rules:
-                    if re.search(diag_keyword_regex, code_text_lower):
-                        found_validation_keyword_page = -1
-                        for i in range(document.page_count - 1, -1, -1):
-                            page_content = self._get_page_text(document.load_page(i), i, self.dpi)
-                            if must_have_keyword.lower() in page_content.lower():
-                                found_validation_keyword_page = i + 1
-                                break
-                        found_page_numbers[must_have_keyword.upper()] = found_validation_keyword_page
-
-        except fitz.FileNotFoundError:
-            error_message = "File PDF tidak ditemukan."
-        except pytesseract.TesseractNotFoundError:
-            error_message = "Mesin Tesseract OCR tidak ditemukan."
-        except Exception as e:
-            error_message = f"Terjadi kesalahan umum saat memproses PDF: {e}"
-        finally:
-            if document:
-                document.close()
-        
-        self.finished.emit(self.pdf_path, results, error_message, found_page_numbers, found_ringkasan_keyword)
 
 # --- Kelas Dialog untuk Mengatur Kata Kunci ---
 class DraggableTableWidget(QTableWidget):
@@ -484,6 +507,290 @@ class ValidationRuleManagerDialog(QDialog):
     def get_updated_rules(self): return self.current_rules
 
 
+# --- Dialog Ringkasan Waktu Pemrosesan ---
+class TimingsSummaryDialog(QDialog):
+    def __init__(self, summary_lines, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Ringkasan Waktu Pemrosesan")
+        self.setGeometry(200, 200, 800, 450)
+        layout = QVBoxLayout()
+        summary_view = QPlainTextEdit()
+        summary_view.setReadOnly(True)
+        summary_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        summary_view.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        summary_view.setPlainText("\n".join(summary_lines))
+        layout.addWidget(summary_view)
+        button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        button_box.rejected.connect(self.reject)
+        layout.addWidget(button_box)
+        self.setLayout(layout)
+
+# --- Penyimpanan Hasil Verifikasi dan Model Tabel (model/view) ---
+STATUS_PENDING = 0
+STATUS_SKIPPED = 1
+STATUS_DONE = 2
+PAGE_PENDING = -2
+PAGE_NOT_FOUND = -1
+TEXT_PENDING = "Memproses..."
+TEXT_NOT_FOUND = "Tidak Ditemukan"
+
+COLOR_TEXT = QColor("#C8CDD3")
+COLOR_MUTED = QColor("#636D83")
+COLOR_PENDING = QColor("#00BFFF")
+COLOR_OK = QColor("#00FF00")
+COLOR_FAIL = QColor("#FF0000")
+
+class ResultRecord:
+    __slots__ = ('path', 'code', 'description', 'status', 'validation', 'ringkasan', 'keyword_pages')
+
+    def __init__(self, path, num_keywords):
+        self.path = path
+        self.code = None
+        self.description = None
+        self.status = STATUS_PENDING
+        self.validation = ""
+        self.ringkasan = False
+        self.keyword_pages = array('i', [PAGE_PENDING]) * num_keywords
+
+class ResultTableModel(QAbstractTableModel):
+    FIXED_HEADERS = RESULT_HEADERS
+    COL_NAME = 1
+    COL_CODE = 2
+    COL_DESCRIPTION = 3
+    COL_VALIDATION = 4
+    COL_RINGKASAN = 5
+    COL_KEYWORDS_START = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.row_by_path = {}
+        self.keyword_headers = []
+        self.keyword_index_by_header = {}
+        self.keyword_index_by_lower_header = {}
+        # Pembaruan dikumpulkan lalu dikirim ke view sekaligus oleh flush_updates()
+        self.dirty_rows = set()
+        self.longest_texts = []
+        self.widened_columns = set()
+        # Lebar kolom Excel (baris terpanjang per kolom), diperbarui bersama longest_texts agar ekspor tidak memindai ulang
+        self.export_widths = []
+
+    def set_keyword_headers(self, keyword_headers):
+        self.beginResetModel()
+        self.keyword_headers = list(keyword_headers)
+        self.keyword_index_by_header = {header: i for i, header in enumerate(self.keyword_headers)}
+        self.keyword_index_by_lower_header = {header.strip().lower(): i for i, header in reversed(list(enumerate(self.keyword_headers)))}
+        self.records = []
+        self.row_by_path = {}
+        self._reset_update_tracking()
+        self.endResetModel()
+
+    def _reset_update_tracking(self):
+        self.dirty_rows = set()
+        self.longest_texts = [max(header.split('\n'), key=len) for header in self.header_texts()]
+        self.widened_columns = set(range(len(self.longest_texts)))
+        self.export_widths = [text_width(header.replace('\n', ' ')) for header in self.header_texts()]
+
+    def reset_records(self, file_paths):
+        self.beginResetModel()
+        self.records = []
+        self.row_by_path = {}
+        num_keywords = len(self.keyword_headers)
+        for file_path in file_paths:
+            if file_path in self.row_by_path:
+                continue
+            self.row_by_path[file_path] = len(self.records)
+            self.records.append(ResultRecord(file_path, num_keywords))
+        self._reset_update_tracking()
+        if self.records:
+            self.longest_texts[0] = max(self.longest_texts[0], str(len(self.records)), key=len)
+            self.longest_texts[self.COL_NAME] = max([self.longest_texts[self.COL_NAME]] + [os.path.basename(path) for path in self.row_by_path], key=len)
+            self.export_widths[0] = max(self.export_widths[0], len(str(len(self.records))))
+            self.export_widths[self.COL_NAME] = max(self.export_widths[self.COL_NAME], text_width(self.longest_texts[self.COL_NAME]))
+            for column in (self.COL_CODE, self.COL_VALIDATION, self.COL_RINGKASAN):
+                self.longest_texts[column] = max(self.longest_texts[column], TEXT_PENDING, key=len)
+        self.endResetModel()
+        return list(self.row_by_path)
+
+    def file_paths(self):
+        return list(self.row_by_path)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.FIXED_HEADERS) + len(self.keyword_headers)
+
+    def header_texts(self):
+        return self.FIXED_HEADERS + self.keyword_headers
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            headers = self.header_texts()
+            if 0 <= section < len(headers):
+                return headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.records[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.cell_text(index.row(), record, column)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self.cell_color(record, column)
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == self.COL_VALIDATION and record.status == STATUS_DONE:
+            return Qt.AlignmentFlag.AlignVCenter | WORD_WRAP_FLAG
+        return None
+
+    def cell_text(self, row, record, column):
+        if column == 0:
+            return str(row + 1)
+        if column == self.COL_NAME:
+            return os.path.basename(record.path)
+        if column == self.COL_CODE:
+            return TEXT_PENDING if record.code is None else record.code
+        if column == self.COL_DESCRIPTION:
+            return TEXT_PENDING if record.description is None else record.description
+        if column == self.COL_VALIDATION:
+            if record.status == STATUS_SKIPPED:
+                return "DILEWATI (Kode Diagnosa tidak relevan)"
+            return TEXT_PENDING if record.status == STATUS_PENDING else record.validation
+        if column == self.COL_RINGKASAN:
+            if record.status == STATUS_SKIPPED:
+                return "-"
+            if record.status == STATUS_PENDING:
+                return TEXT_PENDING
+            return "✓" if record.ringkasan else "✗"
+        page = record.keyword_pages[column - self.COL_KEYWORDS_START]
+        if record.status == STATUS_SKIPPED:
+            return "-"
+        if page > 0:
+            return f"✓ (hal. {page})"
+        return TEXT_PENDING if record.status == STATUS_PENDING else "✗"
+
+    def cell_color(self, record, column):
+        if column <= self.COL_NAME:
+            return None
+        if column in (self.COL_CODE, self.COL_DESCRIPTION):
+            value = record.code if column == self.COL_CODE else record.description
+            if value is None:
+                return COLOR_PENDING
+            return COLOR_MUTED if value == TEXT_NOT_FOUND else COLOR_TEXT
+        if record.status == STATUS_SKIPPED:
+            return COLOR_MUTED
+        if column == self.COL_VALIDATION:
+            if record.status == STATUS_PENDING:
+                return COLOR_PENDING
+            return COLOR_FAIL if "TIDAK LULUS" in record.validation else COLOR_OK
+        if column == self.COL_RINGKASAN:
+            if record.status == STATUS_PENDING:
+                return COLOR_PENDING
+            return COLOR_OK if record.ringkasan else COLOR_FAIL
+        page = record.keyword_pages[column - self.COL_KEYWORDS_START]
+        if page > 0:
+            return COLOR_OK
+        return COLOR_PENDING if record.status == STATUS_PENDING else COLOR_FAIL
+
+    def row_texts(self, row):
+        record = self.records[row]
+        return [self.cell_text(row, record, column) for column in range(self.columnCount())]
+
+    def _track_longest(self, row):
+        record = self.records[row]
+        for column, longest_text in enumerate(self.longest_texts):
+            text = self.cell_text(row, record, column)
+            if len(text) > len(longest_text):
+                self.longest_texts[column] = text
+                self.widened_columns.add(column)
+            if text != TEXT_PENDING:
+                self.export_widths[column] = max(self.export_widths[column], text_width(text))
+
+    def _mark_dirty(self, row):
+        self.dirty_rows.add(row)
+        self._track_longest(row)
+
+    def flush_updates(self):
+        """Mengirim satu dataChanged untuk semua baris yang berubah sejak flush terakhir; mengembalikan baris tersebut."""
+        dirty_rows = self.dirty_rows
+        if not dirty_rows:
+            return []
+        self.dirty_rows = set()
+        self.dataChanged.emit(self.index(min(dirty_rows), 0), self.index(max(dirty_rows), self.columnCount() - 1))
+        return sorted(dirty_rows)
+
+    def take_widened_columns(self):
+        """Kolom yang teks terpanjangnya bertambah sejak panggilan terakhir, beserta teks terpanjang tersebut."""
+        widened_columns = {column: self.longest_texts[column] for column in self.widened_columns}
+        self.widened_columns = set()
+        return widened_columns
+
+    def update_prescan(self, pdf_path, code_text, description_text, is_relevant):
+        row = self.row_by_path.get(pdf_path)
+        if row is None: return
+        record = self.records[row]
+        record.code = code_text
+        record.description = description_text
+        if not is_relevant:
+            record.status = STATUS_SKIPPED
+        self._mark_dirty(row)
+
+    def set_keyword_page(self, pdf_path, display_text, page_number):
+        row = self.row_by_path.get(pdf_path)
+        keyword_index = self.keyword_index_by_header.get(display_text)
+        if row is None or keyword_index is None: return
+        self.records[row].keyword_pages[keyword_index] = page_number
+        self._mark_dirty(row)
+
+    def finish_record(self, pdf_path, found_ringkasan_keyword, validation_text, rule_keyword_pages):
+        row = self.row_by_path.get(pdf_path)
+        if row is None: return
+        record = self.records[row]
+        record.status = STATUS_DONE
+        record.ringkasan = found_ringkasan_keyword
+        record.validation = validation_text
+        for must_have_keyword, page_found in rule_keyword_pages.items():
+            keyword_index = self.keyword_index_by_lower_header.get(must_have_keyword.lower())
+            if keyword_index is not None:
+                record.keyword_pages[keyword_index] = page_found
+        self._mark_dirty(row)
+
+class ResultTableView(QTableView):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 12)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.on_context_menu)
+
+    def on_context_menu(self, pos):
+        index = self.indexAt(pos)
+        if index.isValid():
+            menu = QMenu(self)
+            copy_action = QAction("Salin Nama File", self)
+            copy_action.triggered.connect(lambda: self.copy_file_name(index.row()))
+            menu.addAction(copy_action)
+            menu.exec(self.mapToGlobal(pos))
+
+    def keyPressEvent(self, event):
+        if event.modifiers() == Qt.KeyboardModifier.ControlModifier and event.key() == Qt.Key.Key_C:
+            selected_rows = self.selectionModel().selectedRows()
+            if selected_rows:
+                self.copy_file_name(selected_rows[0].row())
+                return
+        super().keyPressEvent(event)
+
+    def copy_file_name(self, row):
+        text_to_copy = self.model().index(row, ResultTableModel.COL_NAME).data()
+        if text_to_copy:
+            QApplication.clipboard().setText(text_to_copy)
+            QMessageBox.information(self, "Salin Berhasil", f"Nama file '{text_to_copy}' berhasil disalin ke clipboard.")
+
+
 # --- Kelas Utama Aplikasi PDF Verifier ---
 class PdfVerifierApp(QWidget):
     def __init__(self):
@@ -494,7 +801,21 @@ class PdfVerifierApp(QWidget):
         
         self.setWindowTitle("Aplikasi Verifikasi Berkas")
         self.setGeometry(100, 100, 1200, 600)
-        self.worker_threads = []
+        self.scheduler = None
+        self.timings_collector = None
+        self.profile_dir = None
+        self.result_writer = None
+        self.reverifying = False        # True selama verifikasi ulang memakai teks halaman tersimpan
+        # Manifest per folder (hasil terakhir + sidik jari file) untuk melewati file yang tidak berubah
+        self.manifest = None
+        self.manifest_folder = None
+        # Jurnal hasil per file (config.ini: journal_path) untuk melanjutkan batch yang terputus
+        self.journal = None
+        self.settings_version = None
+        self.profile_path = ""
+        # Area blok Diagnosa (config.ini: diagnosis_region); dipertahankan antar proses agar area hasil belajar tidak hilang
+        self.diagnosis_region = None
+        self.diagnosis_region_setting = ""
         self.keywords_file = get_resource_path("keywords.json")
         self.rules_file = get_resource_path("rules.json")
         self.list_teks_dicari = []
@@ -503,19 +824,19 @@ class PdfVerifierApp(QWidget):
         
         self.load_keywords()
         self.load_validation_rules()
+        self.load_ocr_cache()
         self.init_ui()
         self.setStyleSheet(APP_STYLESHEET)
         self.update_table_headers_and_content()
         self.setAcceptDrops(True)
         self.setWindowIcon(QIcon('icon.ico')) 
-        self.worker_thread = None
         self.keywords = {}
         self.rules = {}
     
     def _setup_tesseract_and_dependencies(self):
         """Memuat konfigurasi dan memeriksa dependensi yang memerlukan QMessageBox."""
-        global pytesseract
-        
+        load_dependencies()
+
         # --- KONFIGURASI TESSERACT OCR ---
         config_file = "config.ini"
         config = ConfigParser()
@@ -523,8 +844,10 @@ class PdfVerifierApp(QWidget):
         try:
             config.read(config_file)
             tesseract_path = config.get("Settings", "tesseract_path", fallback="")
+            ocr_backend_name = config.get("Settings", "ocr_backend", fallback="auto")
         except Exception:
             tesseract_path = ""
+            ocr_backend_name = "auto"
 
         if not os.path.exists(tesseract_path):
             QMessageBox.information(self, "Konfigurasi Tesseract",
@@ -538,39 +861,59 @@ class PdfVerifierApp(QWidget):
                 with open(config_file, 'w') as f:
                     config.write(f)
 
-        try:
-            if tesseract_path and os.path.exists(tesseract_path):
-                import pytesseract
-                pytesseract.pytesseract.tesseract_cmd = tesseract_path
-            else:
-                raise FileNotFoundError("Tesseract executable not found.")
-        except ImportError:
+        # Mesin OCR: tesserocr (di dalam proses) jika terinstal, pytesseract sebagai cadangan; bisa dipaksa lewat
+        # ocr_backend = tesserocr / pytesseract di config.ini
+        if verifikasi_engine.pytesseract_module is None and verifikasi_engine.tesserocr_module is None:
             QMessageBox.warning(self, "Import Error",
                                 "Pustaka pytesseract tidak terinstal. Silakan instal dengan 'pip install pytesseract'.")
-            pytesseract = None
-        except FileNotFoundError as e:
+            configure_tesseract(None)
+        elif configure_tesseract(tesseract_path if tesseract_path and os.path.exists(tesseract_path) else None, ocr_backend_name) is None:
             QMessageBox.warning(self, "Tesseract Not Found",
-                                f"Tesseract OCR tidak terinstal atau jalur salah.\n{e}")
-            pytesseract = None
-        except Exception as e:
-            QMessageBox.warning(self, "Konfigurasi Tesseract",
-                                f"Gagal mengatur jalur Tesseract OCR.\nError: {e}")
-            pytesseract = None
+                                "Tesseract OCR tidak terinstal atau jalur salah.\nTesseract executable not found.")
             
-        try:
-            import fitz # PyMuPDF
-        except ImportError:
+        if verifikasi_engine.fitz is None:
             QMessageBox.critical(self, "Import Error",
                                  "PyMuPDF library is not installed. Please install it using 'pip install PyMuPDF'.")
             sys.exit(1)
 
-        try:
-            from PIL import Image
-        except ImportError:
+        if verifikasi_engine.Image is None:
             QMessageBox.critical(self, "Import Error",
                                  "Pillow library is not installed. Please install it using 'pip install Pillow'.")
             sys.exit(1)
 
+    def load_ocr_cache(self):
+        config = ConfigParser()
+        config.read("config.ini")
+        cache_path = config.get("Settings", "ocr_cache_path", fallback=OCR_CACHE_FILE)
+        try:
+            max_mb = config.getint("Settings", "ocr_cache_max_mb", fallback=OCR_CACHE_DEFAULT_MAX_MB)
+            page_text_max_mb = config.getint("Settings", "page_text_cache_max_mb", fallback=PAGE_TEXT_CACHE_DEFAULT_MAX_MB)
+            self.ocr_cache = OcrDiskCache(cache_path, max_mb * 1024 * 1024, page_text_max_mb * 1024 * 1024)
+        except (ValueError, sqlite3.Error) as e:
+            QMessageBox.warning(self, "Cache OCR", f"Gagal membuka cache OCR '{cache_path}': {e}\nOCR akan berjalan tanpa cache.")
+            self.ocr_cache = None
+
+    def flush_ocr_cache(self):
+        if self.ocr_cache is None:
+            return
+        try:
+            self.ocr_cache.flush()
+        except sqlite3.Error:
+            pass    # hanya urutan LRU yang hilang
+
+    def clear_ocr_cache(self):
+        if self.ocr_cache is None:
+            QMessageBox.information(self, "Cache OCR", "Cache OCR tidak aktif.")
+            return
+        size_mb = self.ocr_cache.total_bytes / (1024 * 1024)
+        reply = QMessageBox.question(self, "Hapus Cache OCR", f"Hapus semua hasil OCR yang tersimpan ({size_mb:.1f} MB)?")
+        if reply == QMessageBox.StandardButton.Yes:
+            try:
+                self.ocr_cache.clear()
+                QMessageBox.information(self, "Cache OCR", "Cache OCR berhasil dihapus.")
+            except sqlite3.Error as e:
+                QMessageBox.critical(self, "Cache OCR", f"Gagal menghapus cache OCR: {e}")
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         header_layout = QHBoxLayout()
@@ -604,11 +947,21 @@ class PdfVerifierApp(QWidget):
         self.save_button = QPushButton("Simpan sebagai Excel")
         self.save_button.clicked.connect(self.save_results_to_excel)
         self.save_button.setEnabled(False)
+        self.clear_cache_button = QPushButton("Hapus Cache OCR")
+        self.clear_cache_button.clicked.connect(self.clear_ocr_cache)
+        self.timings_button = QPushButton("Ringkasan Waktu")
+        self.timings_button.clicked.connect(self.show_timings_summary)
+        self.timings_button.setEnabled(False)
+        self.resume_button = QPushButton("Lanjutkan Batch")
+        self.resume_button.clicked.connect(self.resume_batch)
 
         button_layout.addWidget(self.select_folder_button)
+        button_layout.addWidget(self.resume_button)
         button_layout.addWidget(self.manage_keywords_button)
         button_layout.addWidget(self.manage_rules_button)
         button_layout.addWidget(self.save_button)
+        button_layout.addWidget(self.clear_cache_button)
+        button_layout.addWidget(self.timings_button)
         
         controls_layout.addLayout(button_layout)
         controls_layout.addStretch()
@@ -617,19 +970,56 @@ class PdfVerifierApp(QWidget):
         dpi_label = QLabel("DPI OCR:")
         self.dpi_input = QLineEdit("100")
         self.dpi_input.setFixedWidth(60)
+        self.adaptive_dpi_checkbox = QCheckBox("DPI adaptif")
+        self.adaptive_dpi_checkbox.setToolTip(
+            "OCR pada DPI di atas, lalu ulangi pada DPI tinggi (max_dpi di config.ini, default "
+            f"{ADAPTIVE_DEFAULT_MAX_DPI}) hanya untuk halaman yang hasilnya terlalu pendek atau kurang yakin.")
         dpi_layout.addWidget(dpi_label)
         dpi_layout.addWidget(self.dpi_input)
+        dpi_layout.addWidget(self.adaptive_dpi_checkbox)
         
         controls_layout.addLayout(dpi_layout)
+
+        workers_layout = QHBoxLayout()
+        workers_label = QLabel("Worker:")
+        self.workers_input = QLineEdit(str(os.cpu_count() or 1))
+        self.workers_input.setFixedWidth(40)
+        self.process_pool_checkbox = QCheckBox("Multi-proses")
+        self.process_pool_checkbox.setToolTip("Jalankan worker di proses terpisah agar rendering dan pencarian tidak dibatasi GIL.")
+        workers_layout.addWidget(workers_label)
+        workers_layout.addWidget(self.workers_input)
+        workers_layout.addWidget(self.process_pool_checkbox)
+
+        controls_layout.addLayout(workers_layout)
         controls_layout.addStretch()
 
         main_layout.addLayout(controls_layout)
         
-        self.file_table_widget = DraggableTableWidget()
-        self.file_table_widget.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.result_model = ResultTableModel(self)
+        self.file_table_widget = ResultTableView()
+        self.file_table_widget.setModel(self.result_model)
         main_layout.addWidget(self.file_table_widget)
+
+        # Hasil dari worker digabung dan digambar ulang secara berkala, bukan per sinyal
+        self.ui_update_timer = QTimer(self)
+        self.ui_update_timer.setInterval(UI_UPDATE_INTERVAL_MS)
+        self.ui_update_timer.timeout.connect(self.flush_result_updates)
+
+        self.scan_stats_label = QLabel()
+        main_layout.addWidget(self.scan_stats_label)
+        self.reset_scan_stats()
         self.setLayout(main_layout)
     
+    def closeEvent(self, event):
+        if self.scheduler:
+            self.scheduler.cancel()
+        self.finish_timings()
+        self.finish_result_export()
+        self.close_manifest()
+        self.close_journal()
+        self.flush_ocr_cache()
+        super().closeEvent(event)
+
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             all_paths = [url.toLocalFile() for url in event.mimeData().urls()]
@@ -653,7 +1043,8 @@ class PdfVerifierApp(QWidget):
                     pdf_paths.append(path)
 
             if pdf_paths:
-                self.process_selected_pdfs(pdf_paths)
+                manifest_folder = all_paths[0] if len(all_paths) == 1 and os.path.isdir(all_paths[0]) else None
+                self.process_selected_pdfs(pdf_paths, manifest_folder=manifest_folder)
                 event.acceptProposedAction()
             else:
                 event.ignore()
@@ -663,39 +1054,30 @@ class PdfVerifierApp(QWidget):
     def load_keywords(self):
         if os.path.exists(self.keywords_file):
             try:
-                with open(self.keywords_file, 'r') as f:
-                    loaded_data = json.load(f)
-                if isinstance(loaded_data, list) and all(isinstance(item, list) and len(item) == 2 and isinstance(item[0], str) and isinstance(item[1], str) for item in loaded_data):
-                    self.list_teks_dicari = [tuple(item) for item in loaded_data]
-                else:
-                    raise ValueError("Format file kata kunci tidak valid.")
+                self.list_teks_dicari = verifikasi_engine.load_keywords(self.keywords_file)
             except (json.JSONDecodeError, ValueError) as e:
                 QMessageBox.warning(self, "Error Memuat Kata Kunci", f"Gagal memuat kata kunci dari '{self.keywords_file}': {e}\nMenggunakan daftar default kosong."); self.list_teks_dicari = []
         else:
             self.list_teks_dicari = []
 
     def set_default_rules(self):
-        return [
-            (r"i50.*|i11.0|i13.2|i13.0", "echo|echocardiography"),
-            (r"j44.*", "spirometri"),
-            (r"j13|j14.*|j15.*|j16.*|j17.*|j18.*", "thorax"),
-            (r"g40.*|g41.*", "eeg"),
-            (r"d50.*|d59.*|d62.*|d63.*|d64.*", "transfusi prc")
-        ]
+        return list(DEFAULT_VALIDATION_RULES)
 
     def load_validation_rules(self):
         if os.path.exists(self.rules_file):
             try:
-                with open(self.rules_file, 'r') as f:
-                    loaded_data = json.load(f)
-                if isinstance(loaded_data, list) and all(isinstance(item, list) and len(item) == 2 and isinstance(item[0], str) and isinstance(item[1], str) for item in loaded_data):
-                    self.validation_rules = [tuple(item) for item in loaded_data]
-                else:
-                    raise ValueError("Format file aturan validasi tidak valid. Menggunakan aturan default.")
+                self.validation_rules = verifikasi_engine.load_validation_rules(self.rules_file)
             except (json.JSONDecodeError, ValueError) as e:
                 QMessageBox.warning(self, "Error Memuat Aturan Validasi", f"Gagal memuat aturan validasi dari '{self.rules_file}': {e}\nMenggunakan aturan default."); self.validation_rules = self.set_default_rules()
         else:
             self.validation_rules = self.set_default_rules()
+        self.rebuild_rule_index()
+
+    def rebuild_rule_index(self):
+        self.rule_index = RuleIndex(self.validation_rules)
+        if self.rule_index.invalid_patterns:
+            invalid_list = "\n".join(f"- {pattern}: {error}" for pattern, error in self.rule_index.invalid_patterns)
+            QMessageBox.warning(self, "Aturan Validasi Tidak Valid", f"Regex kode diagnosa berikut tidak valid dan diabaikan:\n{invalid_list}")
     
     def save_keywords(self):
         try:
@@ -718,8 +1100,12 @@ class PdfVerifierApp(QWidget):
             if updated_keywords != self.list_teks_dicari:
                 self.list_teks_dicari = updated_keywords
                 self.save_keywords()
+                file_paths = self.result_model.file_paths()
                 self.update_table_headers_and_content()
-                QMessageBox.information(self, "Kata Kunci Diperbarui", "Daftar kata kunci telah diperbarui. Silakan proses ulang file PDF.")
+                if self.reverify_results(file_paths):
+                    QMessageBox.information(self, "Kata Kunci Diperbarui", f"Daftar kata kunci telah diperbarui. {REVERIFY_MESSAGE}")
+                else:
+                    QMessageBox.information(self, "Kata Kunci Diperbarui", "Daftar kata kunci telah diperbarui. Silakan proses ulang file PDF.")
             else: QMessageBox.information(self, "Tidak Ada Perubahan", "Tidak ada perubahan pada daftar kata kunci.")
     
     def show_rule_manager(self):
@@ -728,35 +1114,34 @@ class PdfVerifierApp(QWidget):
             updated_rules = dialog.get_updated_rules()
             if updated_rules != self.validation_rules:
                 self.validation_rules = updated_rules
+                self.rebuild_rule_index()
                 self.save_validation_rules()
+                file_paths = self.result_model.file_paths()
                 self.update_table_headers_and_content()
-                QMessageBox.information(self, "Aturan Diperbarui", "Daftar aturan validasi telah diperbarui. Silakan proses ulang file PDF.")
+                if self.reverify_results(file_paths):
+                    QMessageBox.information(self, "Aturan Diperbarui", f"Daftar aturan validasi telah diperbarui. {REVERIFY_MESSAGE}")
+                else:
+                    QMessageBox.information(self, "Aturan Diperbarui", "Daftar aturan validasi telah diperbarui. Silakan proses ulang file PDF.")
             else: QMessageBox.information(self, "Tidak Ada Perubahan", "Tidak ada perubahan pada daftar aturan.")
 
-    def update_table_headers_and_content(self):
-        ordered_unique_display_texts = []
-        seen_display_texts = set()
-        
-        for _, display_text in self.list_teks_dicari:
-            if display_text not in seen_display_texts: 
-                ordered_unique_display_texts.append(display_text)
-            seen_display_texts.add(display_text)
+    def reverify_results(self, file_paths):
+        """Memproses ulang file yang tadi ada di tabel dengan kata kunci/aturan baru, memakai teks halaman tersimpan
+        untuk file yang belum berubah. Mengembalikan False jika tidak ada file untuk diverifikasi ulang."""
+        if not file_paths:
+            return False
+        self.process_selected_pdfs(file_paths, manifest_folder=self.manifest_folder, reverify=True)
+        return True
 
-        self.unique_display_headers = ordered_unique_display_texts
-        
-        # Perubahan urutan kolom di sini
-        num_columns = 1 + 1 + 2 + 1 + 1 + len(self.unique_display_headers)
-        self.file_table_widget.setColumnCount(num_columns)
-        
-        headers = ["NO.", "NAMA\nFILE", "KODE\nDIAGNOSA", "KETERANGAN\nDIAGNOSA", "VALIDASI\nATURAN", "Permintaan\nRanap"] + self.unique_display_headers
-        self.file_table_widget.setHorizontalHeaderLabels(headers)
+    def update_table_headers_and_content(self):
+        self.unique_display_headers = unique_display_headers(self.list_teks_dicari)
+        self.result_model.set_keyword_headers(self.unique_display_headers)
         
-        for i in range(self.file_table_widget.columnCount() - 1):
-            self.file_table_widget.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeMode.ResizeToContents)
+        for i in range(self.result_model.columnCount() - 1):
+            self.file_table_widget.horizontalHeader().setSectionResizeMode(i, QHeaderView.ResizeMode.Interactive)
         
-        self.file_table_widget.horizontalHeader().setSectionResizeMode(self.file_table_widget.columnCount() - 1, QHeaderView.ResizeMode.Stretch)
+        self.file_table_widget.horizontalHeader().setSectionResizeMode(self.result_model.columnCount() - 1, QHeaderView.ResizeMode.Stretch)
+        self.flush_result_updates()
         
-        self.file_table_widget.setRowCount(0)
         self.save_button.setEnabled(False)
 
     def select_pdf_files(self):
@@ -777,227 +1162,330 @@ class PdfVerifierApp(QWidget):
                     if file.lower().endswith('.pdf'):
                         pdf_paths.append(os.path.join(root, file))
             if pdf_paths:
-                self.process_selected_pdfs(pdf_paths)
+                self.process_selected_pdfs(pdf_paths, manifest_folder=folder_path)
             else:
                 self.save_button.setEnabled(False)
         else:
             self.save_button.setEnabled(False)
 
-    def _get_page_text_from_file(self, file_path, page_num, dpi):
-        try:
-            document = fitz.open(file_path)
-            if page_num >= document.page_count:
-                document.close()
-                return ""
-            page = document.load_page(page_num)
-            text_from_pdf = page.get_text()
-            document.close()
-            if text_from_pdf.strip():
-                return text_from_pdf
-            
-            if not pytesseract: return ""
-            document = fitz.open(file_path)
-            page = document.load_page(page_num)
-            zoom = dpi / 72.0
-            matrix = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=matrix)
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            osd_data = pytesseract.image_to_osd(img)
-            rotation_angle_match = re.search(r"Rotate: (\d+)", osd_data)
-            if rotation_angle_match:
-                angle = int(rotation_angle_match.group(1))
-                if angle != 0: img = img.rotate(-angle, expand=True)
-            config_ocr = '--psm 3 -l eng+ind'
-            text_from_ocr = pytesseract.image_to_string(img, config=config_ocr)
-            document.close()
-            return text_from_ocr
-        except Exception as e:
-            return ""
-
-    def process_selected_pdfs(self, file_paths):
+    def process_selected_pdfs(self, file_paths, manifest_folder=None, resume=False, reverify=False):
         try:
             current_dpi = int(self.dpi_input.text())
             if current_dpi <= 0: raise ValueError("DPI harus bilangan bulat positif.")
         except ValueError as e:
             QMessageBox.warning(self, "Input DPI Tidak Valid", f"DPI harus berupa bilangan bulat positif.\n{e}"); return
+        try:
+            max_workers = int(self.workers_input.text())
+            if max_workers <= 0: raise ValueError("Jumlah worker harus bilangan bulat positif.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Input Worker Tidak Valid", f"Jumlah worker harus berupa bilangan bulat positif.\n{e}"); return
         
-        self.file_table_widget.setRowCount(0)
-        for worker in self.worker_threads: worker.quit(); worker.wait()
-        self.worker_threads.clear()
+        if self.scheduler:
+            self.scheduler.cancel()
+            self.scheduler = None
         self.save_button.setEnabled(False)
-        self.file_table_widget.setRowCount(len(file_paths))
-        
-        relevant_files_to_process = []
+        self.timings_button.setEnabled(False)
+        self.reset_scan_stats()
+        self.start_timings()
+        file_paths = self.result_model.reset_records(file_paths)
+        self.start_result_export()
+        self.flush_result_updates()
+        self.ui_update_timer.start()
 
-        for i, file_path in enumerate(file_paths):
-            self.file_table_widget.setItem(i, 0, QTableWidgetItem(str(i + 1)))
-            self.file_table_widget.setItem(i, 1, QTableWidgetItem(os.path.basename(file_path)))
-            
-            page_1_text = self._get_page_text_from_file(file_path, 0, current_dpi)
-            match_primary = REGEX_EXTRACTION_PRIMARY.search(page_1_text)
-            
-            code_text = "Tidak Ditemukan"
-            description_text = "Tidak Ditemukan"
-            is_relevant_code = False
-            
-            if match_primary:
-                extracted_primary_text = match_primary.group(1).strip()
-                split_match = REGEX_SPLIT_DIAGNOSA.search(extracted_primary_text)
-                if split_match:
-                    code_text = split_match.group(2).strip()
-                    description_text = split_match.group(3).strip()
-                else:
-                    description_text = extracted_primary_text
-                
-                if code_text != "Tidak Ditemukan":
-                    code_text_lower = code_text.lower()
-                    for diag_keyword_regex, _ in self.validation_rules:
-                        if re.search(diag_keyword_regex, code_text_lower):
-                            is_relevant_code = True
-                            break
-            
-            # Mendefinisikan ulang indeks kolom berdasarkan urutan baru
-            col_kode = 2
-            col_keterangan = 3
-            col_validation = 4
-            col_ringkasan = 5
-            col_keywords_start = 6
-
-            kode_item = QTableWidgetItem(code_text)
-            kode_item.setForeground(QColor("#C8CDD3") if code_text != "Tidak Ditemukan" else QColor("#636D83"))
-            self.file_table_widget.setItem(i, col_kode, kode_item)
-            
-            keterangan_item = QTableWidgetItem(description_text)
-            keterangan_item.setForeground(QColor("#C8CDD3") if description_text != "Tidak Ditemukan" else QColor("#636D83"))
-            self.file_table_widget.setItem(i, col_keterangan, keterangan_item)
-            
-            if not is_relevant_code and self.validation_rules:
-                validation_item = QTableWidgetItem("DILEWATI (Kode Diagnosa tidak relevan)")
-                validation_item.setForeground(QColor("#636D83"))
-                self.file_table_widget.setItem(i, col_validation, validation_item)
-                
-                status_item_ringkasan = QTableWidgetItem("-")
-                status_item_ringkasan.setForeground(QColor("#636D83"))
-                self.file_table_widget.setItem(i, col_ringkasan, status_item_ringkasan)
-
-                num_keyword_cols = len(self.unique_display_headers)
-                for j in range(col_keywords_start, col_keywords_start + num_keyword_cols):
-                    status_item = QTableWidgetItem("-")
-                    status_item.setForeground(QColor("#636D83"))
-                    self.file_table_widget.setItem(i, j, status_item)
-            else:
-                num_keyword_cols = len(self.unique_display_headers)
-                for j in range(col_validation, col_keywords_start + num_keyword_cols):
-                    status_item = QTableWidgetItem("Memproses...")
-                    status_item.setForeground(QColor("#00BFFF"))
-                    self.file_table_widget.setItem(i, j, status_item)
-                
-                relevant_files_to_process.append({'path': file_path, 'code': code_text})
-
-        if relevant_files_to_process:
-            for file_info in relevant_files_to_process:
-                worker = PdfProcessingWorker(file_info['path'], self.list_teks_dicari, current_dpi, self.validation_rules, file_info['code'])
-                worker.finished.connect(self.on_processing_finished)
-                worker.keyword_found_signal.connect(self.on_keyword_found)
-                self.worker_threads.append(worker)
-                worker.start()
-        else:
-            self.save_button.setEnabled(True)
-        
-        self.file_table_widget.resizeColumnsToContents()
-        self.file_table_widget.resizeRowsToContents()
+        config = ConfigParser()
+        config.read("config.ini")
+        try:
+            max_pixmaps = config.getint("Settings", "max_pixmaps", fallback=0)
+        except ValueError:
+            max_pixmaps = 0
+        max_dpi = None
+        if self.adaptive_dpi_checkbox.isChecked():
+            try:
+                max_dpi = config.getint("Settings", "max_dpi", fallback=ADAPTIVE_DEFAULT_MAX_DPI)
+            except ValueError:
+                max_dpi = ADAPTIVE_DEFAULT_MAX_DPI
+        diagnosis_region_setting = config.get("Settings", "diagnosis_region", fallback="")
+        if diagnosis_region_setting != self.diagnosis_region_setting:
+            self.diagnosis_region_setting = diagnosis_region_setting
+            try:
+                self.diagnosis_region = DiagnosisRegion.parse(diagnosis_region_setting)
+            except ValueError as e:
+                self.diagnosis_region = None
+                QMessageBox.warning(self, "Area Diagnosa Tidak Valid", f"{e}\nHalaman 1 akan di-OCR penuh.")
+        self.reverifying = reverify
+        self.settings_version = settings_version(self.list_teks_dicari, self.validation_rules, current_dpi, max_dpi,
+                                                 self.diagnosis_region)
+        self.open_manifest(manifest_folder, self.settings_version)
+        if not resume:
+            self.start_journal(file_paths, manifest_folder)
+        # Hasil yang sudah ada di jurnal (batch dilanjutkan) tidak diproses ulang. File yang tercatat di manifest
+        # tetap dikirim sebagai job: worker yang memeriksa apakah file berubah, bukan thread GUI.
+        cached_results = []
+        if self.journal:
+            for file_path in file_paths:
+                file_result = self.journal.cached_result(file_path, self.settings_version)
+                if file_result is not None:
+                    cached_results.append(file_result)
+            cached_paths = {file_result.path for file_result in cached_results}
+            file_paths = [file_path for file_path in file_paths if file_path not in cached_paths]
+        self.scheduler = PdfJobScheduler(max_workers, self.process_pool_checkbox.isChecked(), self.ocr_cache, self, max_pixmaps)
+        self.scheduler.prescan_finished.connect(self.on_prescan_finished)
+        self.scheduler.file_finished.connect(self.on_processing_finished)
+        self.scheduler.keyword_found.connect(self.on_keyword_found)
+        self.scheduler.scan_stats.connect(self.on_scan_stats)
+        self.scheduler.result_ready.connect(self.on_result_ready)
+        self.scheduler.all_finished.connect(self.on_all_processing_finished)
+        for file_result in cached_results:
+            self.show_cached_result(file_result)
+        keyword_matcher = KeywordMatcher.from_rules(self.list_teks_dicari, self.validation_rules)
+        self.scheduler.start(
+            {'path': file_path, 'keywords': self.list_teks_dicari, 'dpi': current_dpi, 'rules': self.validation_rules,
+             'matcher': keyword_matcher, 'rule_index': self.rule_index, 'profile_dir': self.profile_dir,
+             'max_dpi': max_dpi, 'diagnosis_region': self.diagnosis_region,
+             'keep_page_texts': True, 'reuse_page_texts': reverify, 'content_hash': self.manifest is not None,
+             'manifest_candidate': self.manifest.reuse_candidate(file_path) if self.manifest else None}
+            for file_path in file_paths
+        )
+
+    def on_prescan_finished(self, pdf_path, code_text, description_text, is_relevant):
+        self.result_model.update_prescan(pdf_path, code_text, description_text, is_relevant)
+
+    def flush_result_updates(self):
+        started = time.perf_counter()
+        self.result_model.flush_updates()
+        # Lebar kolom mengikuti teks terpanjang yang tercatat di model, jadi baris tidak pernah terbungkus
+        # dan tinggi baris tetap; tidak perlu mengukur ulang seluruh tabel.
+        font_metrics = self.file_table_widget.fontMetrics()
+        last_column = self.result_model.columnCount() - 1
+        for column, longest_text in self.result_model.take_widened_columns().items():
+            if column != last_column:
+                self.file_table_widget.setColumnWidth(column, font_metrics.horizontalAdvance(longest_text) + 24)
+        if self.total_scan_stats_dirty:
+            self.total_scan_stats_dirty = False
+            self._update_scan_stats_label()
+        if self.timings_collector:
+            self.timings_collector.add_stage('ui', time.perf_counter() - started)
+
+    def reset_scan_stats(self):
+        self.total_scan_stats = {'ocr_calls': 0, 'ocr_skipped': 0, 'pages_total': 0, 'pages_untouched': 0, 'files_reused': 0,
+                                 'files_reread': 0}
+        self.total_scan_stats_dirty = False
+        self._update_scan_stats_label()
+
+    def on_scan_stats(self, pdf_path, scan_stats):
+        if scan_stats.get('reused'):
+            # Statistik tersimpan berasal dari run sebelumnya; tidak dihitung lagi
+            self.total_scan_stats['files_reused'] += 1
+            self.total_scan_stats_dirty = True
+            return
+        if self.timings_collector:
+            self.timings_collector.add(pdf_path, scan_stats)
+        if self.reverifying and not scan_stats.get('pages_reused'):
+            # Teks halaman file ini tidak tersimpan (mis. hasilnya dari manifest atau cache penuh): PDF dibaca ulang
+            self.total_scan_stats['files_reread'] += 1
+        for key in self.total_scan_stats:
+            self.total_scan_stats[key] += scan_stats.get(key, 0)
+        self.total_scan_stats_dirty = True
+
+    def _update_scan_stats_label(self):
+        stats = self.total_scan_stats
+        self.scan_stats_label.setText(
+            f"OCR: {stats['ocr_calls']} halaman dijalankan, {stats['ocr_skipped']} dilewati (cache) | "
+            f"Halaman tidak disentuh: {stats['pages_untouched']} dari {stats['pages_total']}"
+            + (f" | Hasil dipakai ulang (manifest/jurnal): {stats['files_reused']} file" if stats['files_reused'] else "")
+            + (f" | Verifikasi ulang: {stats['files_reread']} file dibaca ulang dari PDF (teks halaman tidak tersimpan)"
+               if stats['files_reread'] else "")
+        )
 
     def on_keyword_found(self, pdf_path, display_text, page_number):
-        row = -1
-        for i in range(self.file_table_widget.rowCount()):
-            if self.file_table_widget.item(i, 1).text() == os.path.basename(pdf_path):
-                row = i
-                break
-        if row == -1: return
-
-        # Indeks baru
-        col_keywords_start = 6
-        col = -1
-        for i in range(col_keywords_start, col_keywords_start + len(self.unique_display_headers)):
-            header = self.file_table_widget.horizontalHeaderItem(i).text().replace('\n', ' ')
-            if header == display_text:
-                col = i
-                break
-        if col == -1: return
-
-        item_text = f"✓ (hal. {page_number})"
-        item = QTableWidgetItem(item_text)
-        item.setForeground(QColor("#00FF00"))
-        self.file_table_widget.setItem(row, col, item)
-
-    def on_processing_finished(self, pdf_path, results, error_message, found_page_numbers, found_ringkasan_keyword):
-        row = -1
-        for i in range(self.file_table_widget.rowCount()):
-            if self.file_table_widget.item(i, 1).text() == os.path.basename(pdf_path): row = i; break
-        if row == -1: return
-
-        # Indeks baru
-        col_kode = 2
-        col_validation = 4
-        col_ringkasan = 5
-        col_keywords_start = 6
-        
-        ringkasan_item = QTableWidgetItem("✓" if found_ringkasan_keyword else "✗")
-        ringkasan_item.setForeground(QColor("#00FF00") if found_ringkasan_keyword else QColor("#FF0000"))
-        self.file_table_widget.setItem(row, col_ringkasan, ringkasan_item)
-        
-        num_keyword_cols = len(self.unique_display_headers)
-        for col_idx, display_text in enumerate(self.unique_display_headers, col_keywords_start):
-            current_item = self.file_table_widget.item(row, col_idx)
-            if not current_item or current_item.text() == "Memproses...":
-                item_text = "✗"
-                item = QTableWidgetItem(item_text)
-                item.setForeground(QColor("#FF0000"))
-                self.file_table_widget.setItem(row, col_idx, item)
-
-        validation_status_list = []
-        code_text = self.file_table_widget.item(row, col_kode).text()
-        
-        if code_text != "Tidak Ditemukan":
-            code_text_lower = code_text.lower()
-            for diag_keyword_regex, must_have_keyword in self.validation_rules:
-                if re.search(diag_keyword_regex, code_text_lower):
-                    page_found = found_page_numbers.get(must_have_keyword.upper(), -1)
-                    if page_found != -1:
-                        validation_status_list.append(f"AMAN (di hlm. {page_found})")
-                        
-                        col = -1
-                        for i in range(col_keywords_start, col_keywords_start + num_keyword_cols):
-                            header = self.file_table_widget.horizontalHeaderItem(i).text().replace('\n', ' ').strip()
-                            if header.lower() == must_have_keyword.lower():
-                                col = i
-                                break
-                        if col != -1:
-                            item_text = f"✓ (hal. {page_found})"
-                            item = QTableWidgetItem(item_text)
-                            item.setForeground(QColor("#00FF00"))
-                            self.file_table_widget.setItem(row, col, item)
-                    else:
-                        validation_status_list.append(f"TIDAK AMAN (harus ada '{must_have_keyword}')")
-        
-        if not validation_status_list:
-            validation_item = QTableWidgetItem("LULUS")
-            validation_color = QColor("#00FF00")
-        else:
-            validation_status = ", ".join(validation_status_list)
-            validation_item = QTableWidgetItem(validation_status)
-            validation_color = QColor("#FF0000") if "TIDAK LULUS" in validation_status else QColor("#00FF00")
+        self.result_model.set_keyword_page(pdf_path, display_text, page_number)
+
+    def on_processing_finished(self, pdf_path, results, error_message, found_page_numbers, found_ringkasan_keyword, matched_rules):
+        validation_status, rule_keyword_pages = evaluate_validation(matched_rules, found_page_numbers)
+        self.result_model.finish_record(pdf_path, found_ringkasan_keyword, validation_status, rule_keyword_pages)
+
+    def on_all_processing_finished(self):
+        self.ui_update_timer.stop()
+        self.flush_result_updates()
+        self.finish_timings()
+        self.finish_result_export()
+        self.close_manifest()
+        self.close_journal()
+        self.flush_ocr_cache()
+        self.save_button.setEnabled(True)
+        self.timings_button.setEnabled(True)
+
+    # --- Waktu Pemrosesan dan Profil ---
+    def start_timings(self):
+        """Lokasi file timings (JSON Lines) dan profil cProfile diatur lewat config.ini: timings_path, profile_path."""
+        self.finish_timings()
+        config = ConfigParser()
+        config.read("config.ini")
+        timings_path = config.get("Settings", "timings_path", fallback="")
+        self.profile_path = config.get("Settings", "profile_path", fallback="")
+        try:
+            self.timings_collector = TimingsCollector(timings_path or None)
+        except OSError as e:
+            QMessageBox.warning(self, "Ringkasan Waktu", f"Gagal membuat file timings '{timings_path}': {e}")
+            self.timings_collector = TimingsCollector()
+        self.profile_dir = tempfile.mkdtemp(prefix="verifikasi_profil_") if self.profile_path else None
+
+    def finish_timings(self):
+        if self.timings_collector:
+            self.timings_collector.close()
+        if self.profile_dir:
+            try:
+                merge_profiles(self.profile_dir, self.profile_path)
+            except OSError as e:
+                QMessageBox.warning(self, "Profil", f"Gagal menyimpan profil ke '{self.profile_path}': {e}")
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+            self.profile_dir = None
+
+    # --- Manifest Folder: File yang Tidak Berubah Tidak Diproses Ulang ---
+    def open_manifest(self, folder, version):
+        """Membuka manifest di folder yang diproses (None = tanpa manifest, mis. file dipilih satu per satu).
+        Bisa dimatikan lewat config.ini: use_manifest = false."""
+        self.close_manifest()
+        self.manifest_folder = folder
+        config = ConfigParser()
+        config.read("config.ini")
+        if not folder or not config.getboolean("Settings", "use_manifest", fallback=True):
+            return
+        try:
+            self.manifest = FolderManifest(folder, version)
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Manifest Folder", f"Gagal membuka manifest di '{folder}': {e}\nSemua file akan diproses.")
 
-        validation_item.setTextAlignment(Qt.AlignmentFlag.AlignVCenter | WORD_WRAP_FLAG)
-        validation_item.setForeground(validation_color)
-        self.file_table_widget.setItem(row, col_validation, validation_item)
-        
-        self.file_table_widget.resizeColumnsToContents()
-        self.file_table_widget.resizeRowsToContents()
+    def close_manifest(self):
+        if not self.manifest:
+            return
+        manifest, self.manifest = self.manifest, None
+        try:
+            manifest.close()
+        except sqlite3.Error as e:
+            QMessageBox.warning(self, "Manifest Folder", f"Gagal menyimpan manifest '{manifest.db_path}': {e}")
+
+    def show_cached_result(self, file_result):
+        """Menampilkan hasil dari jurnal seperti hasil worker, tanpa membuka PDF."""
+        pdf_path = file_result.path
+        self.on_prescan_finished(pdf_path, file_result.code, file_result.description, file_result.relevant)
+        if file_result.relevant:
+            self.show_keyword_pages(file_result)
+            self.on_processing_finished(pdf_path, file_result.results, file_result.error, file_result.pages,
+                                        file_result.ringkasan, file_result.matched_rules)
+        self.total_scan_stats['files_reused'] += 1
+        self.total_scan_stats_dirty = True
+        self.on_result_ready(file_result, reused=True)
+
+    def show_keyword_pages(self, file_result):
+        # Hasil tersimpan tidak mengirim event 'keyword'; halaman kata kunci diisi dari hasilnya
+        for display_text, found in file_result.results.items():
+            if found:
+                self.on_keyword_found(file_result.path, display_text, file_result.pages.get(display_text, -1))
+
+    # --- Jurnal Batch: Melanjutkan Batch yang Terputus ---
+    def get_journal_path(self):
+        """Lokasi jurnal dari config.ini (journal_path); kosong = jurnal nonaktif."""
+        config = ConfigParser()
+        config.read("config.ini")
+        return config.get("Settings", "journal_path", fallback=JOURNAL_FILE)
 
-        all_workers_finished = all(not worker.isRunning() for worker in self.worker_threads)
-        if all_workers_finished:
-            self.save_button.setEnabled(True)
+    def start_journal(self, file_paths, folder):
+        self.close_journal()
+        journal_path = self.get_journal_path()
+        if not journal_path:
+            return
+        try:
+            self.journal = ResultJournal(journal_path)
+            self.journal.start_batch(file_paths, folder)
+        except OSError as e:
+            QMessageBox.warning(self, "Jurnal Batch", f"Gagal membuat jurnal '{journal_path}': {e}\nBatch ini tidak bisa dilanjutkan jika terputus.")
+            self.close_journal()
+
+    def close_journal(self):
+        if not self.journal:
+            return
+        journal, self.journal = self.journal, None
+        try:
+            journal.close()
+        except (OSError, ValueError):
+            pass
+
+    def resume_batch(self):
+        """Memproses ulang batch terakhir dari jurnal: file yang sudah tercatat langsung ditampilkan, sisanya diproses."""
+        journal_path = self.get_journal_path()
+        if not journal_path or not os.path.exists(journal_path):
+            QMessageBox.information(self, "Lanjutkan Batch", "Tidak ada batch yang bisa dilanjutkan.")
+            return
+        self.close_journal()
+        try:
+            journal = ResultJournal(journal_path, resume=True)
+        except OSError as e:
+            QMessageBox.warning(self, "Lanjutkan Batch", f"Gagal membaca jurnal '{journal_path}': {e}")
+            return
+        if not journal.file_paths:
+            journal.close()
+            QMessageBox.information(self, "Lanjutkan Batch", "Jurnal tidak berisi daftar file batch.")
+            return
+        self.journal = journal
+        self.process_selected_pdfs(journal.file_paths, manifest_folder=journal.folder, resume=True)
+
+    # --- Ekspor Bertipe per File (CSV/JSONL/Parquet) ---
+    def start_result_export(self):
+        """Lokasi diatur lewat config.ini: result_export_path. Format dari ekstensi (.csv, .jsonl, .parquet, .xlsx);
+        setiap file ditulis begitu selesai, jadi hasil tersedia untuk analitik tanpa menunggu Simpan Hasil."""
+        self.finish_result_export()
+        config = ConfigParser()
+        config.read("config.ini")
+        export_path = config.get("Settings", "result_export_path", fallback="")
+        if not export_path:
+            return
+        self.result_export_headers = self.result_model.header_texts()
+        try:
+            self.result_writer = open_result_writer(export_path, self.result_export_headers)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Ekspor Hasil", f"Gagal membuat file ekspor '{export_path}': {e}")
+
+    def on_result_ready(self, file_result, reused=False):
+        if not reused and file_result.stats.get('reused') == 'manifest' and file_result.relevant:
+            self.show_keyword_pages(file_result)
+        if self.journal and not reused:
+            try:
+                self.journal.record(file_result, self.settings_version)
+            except OSError as e:
+                QMessageBox.warning(self, "Jurnal Batch", f"Gagal menulis jurnal '{self.journal.path}': {e}")
+                self.close_journal()
+        if self.manifest and not reused:
+            try:
+                self.manifest.record(file_result)
+            except sqlite3.Error as e:
+                QMessageBox.warning(self, "Manifest Folder", f"Gagal menulis manifest '{self.manifest.db_path}': {e}")
+                self.close_manifest()
+        if not self.result_writer:
+            return
+        started = time.perf_counter()
+        try:
+            row_texts = result_row_texts(self.result_model.row_by_path.get(file_result.path, 0) + 1, file_result,
+                                         self.result_export_headers[len(RESULT_HEADERS):])
+            self.result_writer.write(row_texts, file_result)
+        except OSError as e:
+            QMessageBox.warning(self, "Ekspor Hasil", f"Gagal menulis ke '{self.result_writer.path}': {e}")
+            self.finish_result_export()
+        if self.timings_collector:
+            self.timings_collector.add_stage('export', time.perf_counter() - started)
+
+    def finish_result_export(self):
+        if not self.result_writer:
+            return
+        writer, self.result_writer = self.result_writer, None
+        try:
+            writer.close()
+        except OSError as e:
+            QMessageBox.warning(self, "Ekspor Hasil", f"Gagal menyimpan file ekspor '{writer.path}': {e}")
+
+    def show_timings_summary(self):
+        if self.timings_collector:
+            TimingsSummaryDialog(self.timings_collector.summary_lines(), self).exec()
 
     def save_results_to_excel(self):
         file_dialog = QFileDialog()
@@ -1005,107 +1493,36 @@ class PdfVerifierApp(QWidget):
         if not excel_path:
             return
 
-        try:
-            from openpyxl import load_workbook
-            import os
-            
-            # --- Periksa keberadaan file ---
-            file_exists = os.path.exists(excel_path)
-            
-            if file_exists:
-                # Jika file ada, muat dan dapatkan worksheet aktif
-                wb = load_workbook(excel_path)
-                ws = wb.active
-                start_row = ws.max_row + 1
-            else:
-                # Jika file tidak ada, buat workbook baru dan tambahkan header
-                wb = Workbook()
-                ws = wb.active
-                ws.title = "Hasil Verifikasi"
-                start_row = 1
-                
-                # --- MENAMBAH HEADER DAN FORMATNYA (HANYA UNTUK FILE BARU) ---
-                headers = [self.file_table_widget.horizontalHeaderItem(i).text().replace('\n', ' ') for i in range(self.file_table_widget.columnCount())]
-                ws.append(headers)
-                
-                header_font = ExcelFont(bold=True, color="000000")
-                header_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-                header_alignment = Alignment(horizontal="center", vertical="center")
-                header_border = Border(left=Side(style='thin', color='000000'), right=Side(style='thin', color='000000'), top=Side(style='thin', color='000000'), bottom=Side(style='thin', color='000000'))
-                
-                for col_idx, header_text in enumerate(headers, 1):
-                    cell = ws.cell(row=start_row, column=col_idx)
-                    cell.value = header_text
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = header_border
-                start_row += 1
-
-            # --- MENAMBAHKAN DATA BARU ---
-            for row in range(self.file_table_widget.rowCount()):
-                row_data = [self.file_table_widget.item(row, col).text() if self.file_table_widget.item(row, col) else "" for col in range(self.file_table_widget.columnCount())]
-                ws.append(row_data)
-
-            # --- MENYESUAIKAN LEBAR KOLOM ---
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if cell.value:
-                             if '\n' in str(cell.value):
-                                 cell.alignment = Alignment(wrap_text=True)
-                             content_length = len(max(str(cell.value).split('\n'), key=len))
-                             if content_length > max_length: max_length = content_length
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column].width = adjusted_width
-
-            # --- Simpan buku kerja ---
-            wb.save(excel_path)
-            QMessageBox.information(self, "Simpan Berhasil", f"Hasil berhasil disimpan ke:\n{excel_path}")
+        # File lama tidak dibuka ulang (lambat dan boros memori untuk rekap bulanan yang besar); hasil baru ditulis
+        # ke file lanjutan di sebelahnya, kecuali pengguna memilih menimpa
+        if os.path.exists(excel_path):
+            next_path = rollover_path(excel_path)
+            message_box = QMessageBox(self)
+            message_box.setIcon(QMessageBox.Icon.Question)
+            message_box.setWindowTitle("File Sudah Ada")
+            message_box.setText(f"{os.path.basename(excel_path)} sudah ada.\n\n"
+                                f"Simpan hasil ini sebagai file lanjutan {os.path.basename(next_path)}, atau timpa file lama?")
+            rollover_button = message_box.addButton("File Lanjutan", QMessageBox.ButtonRole.AcceptRole)
+            overwrite_button = message_box.addButton("Timpa", QMessageBox.ButtonRole.DestructiveRole)
+            message_box.addButton(QMessageBox.StandardButton.Cancel)
+            message_box.setDefaultButton(rollover_button)
+            message_box.exec()
+            if message_box.clickedButton() == rollover_button:
+                excel_path = next_path
+            elif message_box.clickedButton() != overwrite_button:
+                return
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error Menyimpan", f"Gagal menyimpan file Excel: {e}")
-            header_font = ExcelFont(bold=True, color="000000")
-            header_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            header_border = Border(left=Side(style='thin', color='000000'), right=Side(style='thin', color='000000'), top=Side(style='thin', color='000000'), bottom=Side(style='thin', color='000000'))
-            
-            for col in range(1, len(headers) + 1):
-                cell = ws.cell(row=1, column=col)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = header_border
-            
-            for row in range(self.file_table_widget.rowCount()):
-                row_data = [self.file_table_widget.item(row, col).text() if self.file_table_widget.item(row, col) else "" for col in range(self.file_table_widget.columnCount())]
-                ws.append(row_data)
-            
-            for col in ws.columns:
-                max_length = 0
-                column = col[0].column_letter
-                for cell in col:
-                    try:
-                        if cell.value:
-                             if '\n' in str(cell.value):
-                                 cell.alignment = Alignment(wrap_text=True)
-                             content_length = len(max(str(cell.value).split('\n'), key=len))
-                             if content_length > max_length: max_length = content_length
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column].width = adjusted_width
-            
-            wb.save(excel_path)
+        try:
+            writer = XlsxResultWriter(excel_path, self.result_model.header_texts(), self.result_model.export_widths)
+            for row in range(self.result_model.rowCount()):
+                writer.write(self.result_model.row_texts(row), None)
+            writer.close()
             QMessageBox.information(self, "Simpan Berhasil", f"Hasil berhasil disimpan ke:\n{excel_path}")
         except Exception as e:
             QMessageBox.critical(self, "Error Menyimpan", f"Gagal menyimpan file Excel: {e}")
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = PdfVerifierApp()
     window.show()
@@ -0,0 +1,312 @@
+"""Benchmark verifikasi dengan berkas klaim PDF sintetis yang dibuat sendiri oleh PyMuPDF.
+
+Contoh:
+    python verifikasi_bench.py                          # korpus default, OCR tiruan jika tesseract tidak ada
+    python verifikasi_bench.py --max-pages 50 --workers 4 --report hasil_bench.json
+    python verifikasi_bench.py --ocr tesseract --tesseract "C:\\Program Files\\Tesseract-OCR\\tesseract.exe"
+
+Korpus disimpan di --corpus beserta corpus.json dan hanya dibuat ulang jika spesifikasinya berubah,
+sehingga dua pengukuran memakai file yang sama persis.
+"""
+import sys
+import os
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+import verifikasi_engine
+from verifikasi_engine import (
+    load_dependencies, configure_tesseract, set_ocr_backend, get_ocr_backend_name, unique_display_headers, result_row_texts, iter_job_results,
+    load_keywords, load_validation_rules, get_resource_path, DEFAULT_VALIDATION_RULES, RESULT_HEADERS, OcrDiskCache, DiagnosisRegion, KeywordMatcher, RuleIndex,
+    TimingsCollector, merge_profiles
+)
+from verifikasi_export import open_result_writer
+
+# (profil, jumlah halaman). text = lapisan teks, scanned = hanya gambar, rotated = gambar dengan /Rotate 90,
+# sideways = gambar yang isinya terputar 90 derajat tanpa /Rotate (perlu OSD), mixed = lapisan teks dengan
+# sebagian halaman hasil scan.
+DEFAULT_CORPUS = [
+    ('text', 5), ('text', 20), ('text', 100), ('text', 500),
+    ('scanned', 5), ('scanned', 20), ('scanned', 100),
+    ('rotated', 5), ('rotated', 20),
+    ('sideways', 5), ('sideways', 20),
+    ('mixed', 50), ('mixed', 500),
+]
+# Campuran kode yang cocok aturan default dan yang tidak (file DILEWATI)
+DIAGNOSES = [
+    ("I50.0", "Gagal jantung kongestif"), ("J18.9", "Pneumonia"), ("K35.8", "Appendicitis akut"),
+    ("J44.1", "PPOK eksaserbasi akut"), ("E11.9", "Diabetes melitus tipe 2"), ("G40.9", "Epilepsi"),
+    ("D64.9", "Anemia"), ("A09", "Gastroenteritis"), ("I11.0", "Penyakit jantung hipertensi"),
+]
+FILLER_WORDS = ("pasien", "keluhan", "nyeri", "demam", "tekanan", "darah", "nadi", "respirasi", "terapi", "infus",
+                "observasi", "kesadaran", "compos", "mentis", "lemas", "mual", "muntah", "batuk", "sesak", "obat")
+STUB_OCR_TEXT = "Diagnosa Utama : I50.0 - Gagal jantung kongestif\nkeluhan sesak napas, observasi tanda vital\n"
+CORPUS_MANIFEST = "corpus.json"
+
+# --- Pembuatan Korpus ---
+def _filler_lines(rng, count):
+    return [" ".join(rng.choice(FILLER_WORDS) for _ in range(rng.randint(6, 12))) for _ in range(count)]
+
+def _page_texts(rng, page_count, code, description, keywords):
+    """Isi teks setiap halaman: header diagnosa di halaman 1, halaman discharge planning, lalu kata kunci sesudahnya."""
+    pages = [_filler_lines(rng, 30) for _ in range(page_count)]
+    pages[0] = ["RESUME MEDIS", f"Nama Pasien : PASIEN {rng.randint(1000, 9999)}",
+                f"Diagnosa Utama : {code} - {description}", "Diagnosa Sekunder : -", "Validasi hasil oleh DPJP"] + pages[0][:20]
+    discharge_page = rng.randint(0, max(0, page_count // 2))
+    pages[discharge_page].insert(1, rng.choice(["Kriteria Discharge Planing", "Permintaan Rawat Inap", "RM 29"]))
+    for keyword in keywords:
+        if rng.random() < 0.6:
+            pages[rng.randint(discharge_page, page_count - 1)].append(f"Pemeriksaan {keyword} sudah dilakukan")
+    return pages
+
+def _add_text_page(document, lines):
+    page = document.new_page(width=595, height=842)
+    page.insert_textbox(page.rect + (40, 40, -40, -40), "\n".join(lines), fontsize=10)
+    return page
+
+def _add_scanned_page(document, lines, scan_dpi, rotation, sideways=False):
+    fitz = verifikasi_engine.fitz
+    source = fitz.open()
+    _add_text_page(source, lines)
+    zoom = scan_dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom).prerotate(90) if sideways else fitz.Matrix(zoom, zoom)
+    pix = source[0].get_pixmap(matrix=matrix, colorspace=fitz.csGRAY)
+    source.close()
+    page = document.new_page(width=842, height=595) if sideways else document.new_page(width=595, height=842)
+    page.insert_image(page.rect, pixmap=pix)
+    if rotation:
+        page.set_rotation(rotation)
+    return page
+
+def generate_corpus(corpus_dir, corpus_spec, keywords, seed, scan_dpi):
+    """Membuat file PDF sintetis sesuai spesifikasi. Mengembalikan daftar entri manifest."""
+    fitz = verifikasi_engine.fitz
+    rng = random.Random(seed)
+    os.makedirs(corpus_dir, exist_ok=True)
+    entries = []
+    for index, (profile, page_count) in enumerate(corpus_spec):
+        code, description = DIAGNOSES[index % len(DIAGNOSES)]
+        file_name = f"klaim_{index + 1:03d}_{profile}_{page_count}hlm.pdf"
+        document = fitz.open()
+        for page_num, lines in enumerate(_page_texts(rng, page_count, code, description, keywords)):
+            if profile == 'text' or (profile == 'mixed' and page_num % 5):
+                _add_text_page(document, lines)
+            else:
+                _add_scanned_page(document, lines, scan_dpi, 90 if profile == 'rotated' else 0, profile == 'sideways')
+        document.save(os.path.join(corpus_dir, file_name), garbage=3, deflate=True)
+        document.close()
+        entries.append({'file': file_name, 'profile': profile, 'pages': page_count, 'code': code})
+    return entries
+
+def load_or_generate_corpus(corpus_dir, corpus_spec, keywords, seed, scan_dpi, regenerate=False):
+    manifest_path = os.path.join(corpus_dir, CORPUS_MANIFEST)
+    spec = {'seed': seed, 'scan_dpi': scan_dpi, 'corpus': [list(item) for item in corpus_spec], 'keywords': keywords}
+    if not regenerate and os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('spec') == spec and all(os.path.exists(os.path.join(corpus_dir, entry['file'])) for entry in manifest['files']):
+            return manifest['files'], False
+    if os.path.isdir(corpus_dir):
+        shutil.rmtree(corpus_dir)
+    entries = generate_corpus(corpus_dir, corpus_spec, keywords, seed, scan_dpi)
+    with open(manifest_path, 'w') as f:
+        json.dump({'spec': spec, 'files': entries}, f, indent=2)
+    return entries, True
+
+# --- OCR Tiruan ---
+class StubOcrBackend:
+    """Mesin OCR tiruan saat tesseract tidak terinstal: gambar tetap di-render, OCR hanya meniru biayanya."""
+    name = 'stub'
+
+    def __init__(self, delay_ms=0, text=STUB_OCR_TEXT):
+        self.delay = delay_ms / 1000.0
+        self.text = text
+
+    def detect_orientation(self, image):
+        if self.delay:
+            time.sleep(self.delay / 4)
+        return 0
+
+    def image_to_text(self, image):
+        if self.delay:
+            time.sleep(self.delay)
+        return self.text
+
+# --- Pengukuran ---
+def peak_rss_mb():
+    """Puncak memori (MB) proses ini dan proses anak terbesar, atau None jika tidak bisa diukur."""
+    try:
+        import resource
+    except ImportError:
+        resource = None
+    if resource is not None:
+        scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+        return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+                resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024), None
+    except (ImportError, AttributeError):
+        return None, None
+
+def run_benchmark(pdf_paths, texts_to_find_tuples, validation_rules, dpi, workers, use_processes, ocr_cache, export_path,
+                  timings_path=None, profile_dir=None, max_pixmaps=None, max_dpi=None, diagnosis_region=None):
+    keyword_headers = unique_display_headers(texts_to_find_tuples)
+    keyword_matcher = KeywordMatcher.from_rules(texts_to_find_tuples, validation_rules)
+    rule_index = RuleIndex(validation_rules)
+    jobs = ({'path': pdf_path, 'keywords': texts_to_find_tuples, 'dpi': dpi, 'rules': validation_rules,
+             'matcher': keyword_matcher, 'rule_index': rule_index, 'profile_dir': profile_dir,
+             'max_dpi': max_dpi, 'diagnosis_region': diagnosis_region} for pdf_path in pdf_paths)
+    row_number_by_path = {pdf_path: i + 1 for i, pdf_path in enumerate(pdf_paths)}
+    errors = skipped = 0
+
+    collector = TimingsCollector(timings_path)
+    writer = open_result_writer(export_path, RESULT_HEADERS + keyword_headers)
+    for file_result in iter_job_results(jobs, workers, use_processes, ocr_cache, max_pixmaps):
+        errors += bool(file_result.error)
+        skipped += not file_result.relevant
+        collector.add(file_result.path, file_result.stats)
+        # Menyusun baris hasil termasuk tahap 'export' (sama seperti di GUI); 'validate' hanya diukur oleh worker
+        started = time.perf_counter()
+        row_texts = result_row_texts(row_number_by_path[file_result.path], file_result, keyword_headers)
+        writer.write(row_texts, file_result)
+        collector.add_stage('export', time.perf_counter() - started)
+    started = time.perf_counter()
+    writer.close()
+    collector.add_stage('export', time.perf_counter() - started)
+    collector.close()
+
+    report = collector.summary()
+    wall_seconds = report['wall_seconds']
+    peak_self, peak_children = peak_rss_mb()
+    report.update({
+        'errors': errors,
+        'skipped': skipped,
+        'files_per_sec': report['files'] / wall_seconds if wall_seconds else 0.0,
+        'pages_per_sec': report['pages_total'] / wall_seconds if wall_seconds else 0.0,
+        'peak_rss_mb': peak_self,
+        'peak_child_rss_mb': peak_children,
+    })
+    return report, collector.summary_lines()
+
+def print_report(report, summary_lines, stream=sys.stdout):
+    print(f"File: {report['files']} ({report['skipped']} dilewati, {report['errors']} gagal) | "
+          f"{report['files_per_sec']:.2f} file/detik | {report['pages_per_sec']:.1f} halaman/detik", file=stream)
+    if report['peak_rss_mb'] is not None:
+        child_text = f", proses anak {report['peak_child_rss_mb']:.0f} MB" if report['peak_child_rss_mb'] else ""
+        print(f"Puncak memori: {report['peak_rss_mb']:.0f} MB{child_text}", file=stream)
+    for line in summary_lines:
+        print(line, file=stream)
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Benchmark verifikasi dengan PDF klaim sintetis.")
+    parser.add_argument("--corpus", default=os.path.join(tempfile.gettempdir(), "verifikasi_bench_corpus"),
+                        help="Folder korpus sintetis (dibuat jika belum ada).")
+    parser.add_argument("--regenerate", action="store_true", help="Buat ulang korpus walaupun sudah ada.")
+    parser.add_argument("--seed", type=int, default=1, help="Seed pembuatan korpus (default 1).")
+    parser.add_argument("--max-pages", type=int, default=500, help="Lewati dokumen korpus yang lebih panjang dari ini.")
+    parser.add_argument("--copies", type=int, default=1, help="Proses setiap file korpus sebanyak ini (default 1).")
+    parser.add_argument("--scan-dpi", type=int, default=72, help="Resolusi gambar halaman scan sintetis (default 72).")
+    parser.add_argument("--keywords", default=get_resource_path("keywords.json"), help="File JSON kata kunci.")
+    parser.add_argument("--rules", default=get_resource_path("rules.json"),
+                        help="File JSON aturan validasi. Jika tidak ada, aturan default dipakai.")
+    parser.add_argument("--dpi", type=int, default=100, help="DPI untuk OCR (default 100).")
+    parser.add_argument("--max-dpi", type=int, help="DPI adaptif: ulangi OCR halaman yang hasilnya lemah pada DPI ini.")
+    parser.add_argument("--diagnosis-region", help="OCR halaman 1 scan hanya pada area blok Diagnosa: 'auto' atau x0,y0,x1,y1.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah file yang diproses bersamaan.")
+    parser.add_argument("--max-pixmaps", type=int,
+                        help="Batas gambar halaman hasil render di memori (default 2 x --workers).")
+    parser.add_argument("--processes", action="store_true", help="Gunakan proses terpisah (tidak untuk OCR stub).")
+    parser.add_argument("--ocr", choices=("auto", "tesserocr", "pytesseract", "stub"), default="auto",
+                        help="Mesin OCR: tesserocr, pytesseract, stub (tiruan), atau auto (tesserocr/pytesseract jika ada, "
+                             "selain itu stub).")
+    parser.add_argument("--tesseract", help="Lokasi tesseract. Default dari PATH.")
+    parser.add_argument("--stub-ocr-ms", type=float, default=0.0, help="Waktu tiruan per halaman untuk OCR stub (ms).")
+    parser.add_argument("--ocr-cache", help="Pakai cache OCR di lokasi ini (default tanpa cache).")
+    parser.add_argument("--report", help="Simpan hasil pengukuran sebagai JSON.")
+    parser.add_argument("--timings", help="Simpan waktu per file dan per halaman (JSON Lines).")
+    parser.add_argument("--profile", help="Rekam cProfile per file dan gabungkan ke file .prof ini (+ ringkasan .txt).")
+    return parser
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.copies <= 0 or args.workers <= 0 or args.dpi <= 0 or args.scan_dpi <= 0:
+        parser.error("--copies, --workers, --dpi dan --scan-dpi harus bilangan bulat positif.")
+
+    load_dependencies()
+    if verifikasi_engine.fitz is None:
+        print("Kesalahan: PyMuPDF tidak terinstal. Instal dengan 'pip install PyMuPDF'.", file=sys.stderr)
+        return 1
+
+    if verifikasi_engine.Image is None:
+        print("Kesalahan: Pillow tidak terinstal. Instal dengan 'pip install Pillow'.", file=sys.stderr)
+        return 1
+    ocr_backend = None
+    if args.ocr != 'stub':
+        ocr_backend = configure_tesseract(args.tesseract or shutil.which("tesseract"), args.ocr)
+        if ocr_backend is None and args.ocr != 'auto':
+            parser.error(f"mesin OCR '{args.ocr}' tidak tersedia; periksa instalasi atau pakai --ocr stub.")
+    if ocr_backend is None:
+        if args.processes:
+            parser.error("--processes tidak bisa dipakai dengan OCR stub.")
+        set_ocr_backend(StubOcrBackend(args.stub_ocr_ms))
+
+    try:
+        texts_to_find_tuples = load_keywords(args.keywords)
+        validation_rules = load_validation_rules(args.rules) if os.path.exists(args.rules) else DEFAULT_VALIDATION_RULES
+    except (OSError, ValueError) as e:
+        print(f"Kesalahan: {e}", file=sys.stderr)
+        return 2
+    corpus_spec = [item for item in DEFAULT_CORPUS if item[1] <= args.max_pages]
+    generate_started = time.perf_counter()
+    corpus_keywords = list(dict.fromkeys([search_text for search_text, _ in texts_to_find_tuples] +
+                                         [must_have_keyword for _, must_have_keyword in validation_rules]))
+    entries, generated = load_or_generate_corpus(args.corpus, corpus_spec, corpus_keywords,
+                                                 args.seed, args.scan_dpi, args.regenerate)
+    if generated:
+        print(f"Korpus dibuat di {args.corpus} dalam {time.perf_counter() - generate_started:.1f} detik.", file=sys.stderr)
+    pdf_paths = [os.path.join(args.corpus, entry['file']) for entry in entries]
+    if args.copies > 1:
+        # Salinan fisik agar cache per path/hash tidak membuat salinan berikutnya gratis
+        copy_dir = os.path.join(args.corpus, f"salinan_{args.copies}")
+        os.makedirs(copy_dir, exist_ok=True)
+        copied_paths = []
+        for copy_index in range(1, args.copies):
+            for pdf_path in pdf_paths:
+                copy_path = os.path.join(copy_dir, f"{copy_index}_{os.path.basename(pdf_path)}")
+                if not os.path.exists(copy_path):
+                    shutil.copyfile(pdf_path, copy_path)
+                copied_paths.append(copy_path)
+        pdf_paths += copied_paths
+
+    try:
+        diagnosis_region = DiagnosisRegion.parse(args.diagnosis_region)
+    except ValueError as e:
+        parser.error(str(e))
+    ocr_cache = OcrDiskCache(args.ocr_cache, 512 * 1024 * 1024) if args.ocr_cache else None
+    with tempfile.TemporaryDirectory() as work_dir:
+        profile_dir = os.path.join(work_dir, "profil") if args.profile else None
+        if profile_dir:
+            os.makedirs(profile_dir)
+        report, summary_lines = run_benchmark(pdf_paths, texts_to_find_tuples, validation_rules, args.dpi, args.workers,
+                                              args.processes, ocr_cache, os.path.join(work_dir, "Hasil_Verifikasi.xlsx"),
+                                              args.timings, profile_dir, args.max_pixmaps, args.max_dpi,
+                                              diagnosis_region)
+        if ocr_cache:
+            ocr_cache.flush()
+        if profile_dir and not merge_profiles(profile_dir, args.profile):
+            print("Peringatan: tidak ada profil yang terekam.", file=sys.stderr)
+    report.update({'ocr_backend': get_ocr_backend_name(), 'workers': args.workers,
+                   'processes': args.processes, 'max_pixmaps': args.max_pixmaps, 'dpi': args.dpi, 'max_dpi': args.max_dpi, 'diagnosis_region': args.diagnosis_region, 'corpus': args.corpus, 'seed': args.seed})
+    print_report(report, summary_lines)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""Verifikasi PDF tanpa antarmuka grafis (tidak memerlukan PyQt6).
+
+Contoh:
+    python verifikasi_cli.py D:\\Berkas\\Januari --output hasil.xlsx --output hasil.jsonl --workers 4
+"""
+import sys
+import os
+import time
+import shutil
+import sqlite3
+import argparse
+import itertools
+import tempfile
+from configparser import ConfigParser
+
+import verifikasi_engine
+from verifikasi_engine import (
+    get_resource_path, load_dependencies, configure_tesseract, unique_display_headers, result_row_texts,
+    load_keywords, load_validation_rules, iter_job_results, DEFAULT_VALIDATION_RULES, RESULT_HEADERS,
+    OCR_CACHE_FILE, OCR_CACHE_DEFAULT_MAX_MB, JOURNAL_FILE, OCR_BACKEND_NAMES, OCR_BATCH_PAGES, PIXMAPS_PER_WORKER,
+    OcrDiskCache, DiagnosisRegion, FolderManifest, ResultJournal, KeywordMatcher, RuleIndex, TimingsCollector, merge_profiles, settings_version
+)
+from verifikasi_export import open_result_writer
+
+EXIT_OK = 0
+EXIT_FATAL = 1
+EXIT_USAGE = 2
+EXIT_FILE_ERRORS = 3
+
+def collect_pdf_paths(input_paths):
+    pdf_paths = []
+    for path in input_paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for file in sorted(files):
+                    if file.lower().endswith('.pdf'):
+                        pdf_paths.append(os.path.join(root, file))
+        elif os.path.isfile(path) and path.lower().endswith('.pdf'):
+            pdf_paths.append(path)
+        else:
+            raise ValueError(f"Bukan folder atau file PDF: {path}")
+    return list(dict.fromkeys(pdf_paths))
+
+def open_folder_manifests(input_paths, version):
+    """Satu FolderManifest untuk setiap folder input. Folder yang manifest-nya tidak bisa dibuka diproses penuh."""
+    manifests = []
+    for path in input_paths:
+        if os.path.isdir(path):
+            try:
+                manifests.append(FolderManifest(os.path.abspath(path), version))
+            except sqlite3.Error as e:
+                print(f"Peringatan: gagal membuka manifest di '{path}': {e}. Semua file di folder ini diproses.", file=sys.stderr)
+    return manifests
+
+def find_manifest(manifests, pdf_path):
+    pdf_path = os.path.abspath(pdf_path)
+    for manifest in manifests:
+        if os.path.commonpath([manifest.folder, pdf_path]) == manifest.folder:
+            return manifest
+    return None
+
+# --- Pengaturan ---
+def resolve_tesseract_cmd(cli_value, config):
+    if cli_value:
+        return cli_value if os.path.exists(cli_value) else None
+    config_value = config.get("Settings", "tesseract_path", fallback="")
+    if config_value and os.path.exists(config_value):
+        return config_value
+    return shutil.which("tesseract")
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description="Verifikasi berkas PDF tanpa antarmuka grafis.")
+    parser.add_argument("inputs", nargs="*", help="Folder (dipindai rekursif) atau file PDF. Boleh kosong dengan --resume.")
+    parser.add_argument("-o", "--output", action="append", required=True,
+                        help="File hasil: .xlsx (seperti tabel), atau .csv, .jsonl, .parquet (rekaman bertipe per file). Boleh diulang.")
+    parser.add_argument("--keywords", default=get_resource_path("keywords.json"), help="File JSON kata kunci.")
+    parser.add_argument("--rules", default=get_resource_path("rules.json"),
+                        help="File JSON aturan validasi. Jika tidak ada, aturan default dipakai.")
+    parser.add_argument("--dpi", type=int, default=100, help="DPI untuk OCR (default 100).")
+    parser.add_argument("--max-dpi", type=int,
+                        help="DPI adaptif: OCR pada --dpi, lalu ulangi pada DPI ini hanya untuk halaman yang hasilnya lemah.")
+    parser.add_argument("--diagnosis-region",
+                        help="OCR halaman 1 scan hanya pada area blok Diagnosa: 'auto' (dipelajari dari PDF berlapis teks) "
+                             "atau x0,y0,x1,y1 (pecahan lebar/tinggi halaman). Default dari config.ini, atau nonaktif.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Jumlah file yang diproses bersamaan.")
+    parser.add_argument("--processes", action="store_true", help="Gunakan proses terpisah alih-alih thread.")
+    parser.add_argument("--max-pixmaps", type=int,
+                        help=f"Batas gambar halaman hasil render di memori untuk semua worker (default {PIXMAPS_PER_WORKER} x --workers).")
+    parser.add_argument("--tesseract", help="Lokasi tesseract.exe. Default dari config.ini atau PATH.")
+    parser.add_argument("--ocr-backend", choices=OCR_BACKEND_NAMES,
+                        help="Mesin OCR: tesserocr (di dalam proses), pytesseract, atau auto (default, dari config.ini).")
+    parser.add_argument("--ocr-batch-pages", type=int, default=OCR_BATCH_PAGES,
+                        help=f"Halaman scan per panggilan tesseract.exe untuk mesin pytesseract (default {OCR_BATCH_PAGES}, 1 = tanpa batch).")
+    parser.add_argument("--config", default="config.ini", help="File config.ini (default config.ini).")
+    parser.add_argument("--no-ocr-cache", action="store_true", help="Jangan pakai cache OCR di disk.")
+    parser.add_argument("--manifest", action="store_true",
+                        help="Lewati file yang tidak berubah sejak proses sebelumnya (manifest per folder input); "
+                             "semua file diproses ulang jika kata kunci, aturan atau DPI berubah.")
+    parser.add_argument("--journal",
+                        help=f"Catat hasil setiap file ke jurnal ini (JSON Lines) segera setelah selesai (default {JOURNAL_FILE} jika --resume).")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lanjutkan batch dari jurnal: file yang sudah tercatat tidak diproses ulang. "
+                             "Tanpa input, daftar file diambil dari jurnal.")
+    parser.add_argument("--timings", help="Simpan waktu per file dan per halaman (JSON Lines) ke file ini.")
+    parser.add_argument("--profile", help="Rekam cProfile per file dan gabungkan ke file .prof ini (+ ringkasan .txt).")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Jangan tampilkan kemajuan per file.")
+    return parser
+
+def main(argv=None):
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.dpi <= 0:
+        parser.error("DPI harus bilangan bulat positif.")
+    if args.max_dpi is not None and args.max_dpi <= args.dpi:
+        parser.error("--max-dpi harus lebih besar dari --dpi.")
+    if args.workers <= 0:
+        parser.error("Jumlah worker harus bilangan bulat positif.")
+    if args.max_pixmaps is not None and args.max_pixmaps <= 0:
+        parser.error("Batas pixmap harus bilangan bulat positif.")
+    if args.ocr_batch_pages <= 0:
+        parser.error("Jumlah halaman per batch OCR harus bilangan bulat positif.")
+    if not args.inputs and not args.resume:
+        parser.error("Masukkan folder atau file PDF (atau --resume untuk melanjutkan batch dari jurnal).")
+
+    config = ConfigParser()
+    config.read(args.config)
+
+    load_dependencies()
+    if verifikasi_engine.fitz is None:
+        print("Kesalahan: PyMuPDF tidak terinstal. Instal dengan 'pip install PyMuPDF'.", file=sys.stderr)
+        return EXIT_FATAL
+    tesseract_cmd = resolve_tesseract_cmd(args.tesseract, config)
+    ocr_backend_name = args.ocr_backend or config.get("Settings", "ocr_backend", fallback="auto")
+    if ocr_backend_name not in OCR_BACKEND_NAMES:
+        parser.error(f"Mesin OCR tidak dikenal: {ocr_backend_name}")
+    ocr_backend = configure_tesseract(tesseract_cmd, ocr_backend_name)
+    if ocr_backend is None:
+        print("Peringatan: tesseract tidak ditemukan, OCR dinonaktifkan (hanya lapisan teks yang dibaca).", file=sys.stderr)
+    elif not args.quiet:
+        print(f"Mesin OCR: {ocr_backend.name}", file=sys.stderr)
+
+    try:
+        texts_to_find_tuples = load_keywords(args.keywords)
+        validation_rules = load_validation_rules(args.rules) if os.path.exists(args.rules) else DEFAULT_VALIDATION_RULES
+    except (OSError, ValueError) as e:
+        print(f"Kesalahan: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    journal_path = args.journal or (JOURNAL_FILE if args.resume else None)
+    journal = None
+    try:
+        if args.resume:
+            journal = ResultJournal(journal_path, resume=True)
+        pdf_paths = collect_pdf_paths(args.inputs) if args.inputs else list(journal.file_paths)
+        if not pdf_paths:
+            raise ValueError("Tidak ada file PDF yang ditemukan.")
+        if journal is None and journal_path:
+            journal = ResultJournal(journal_path)
+            journal.start_batch(pdf_paths, os.path.abspath(args.inputs[0]) if len(args.inputs) == 1 and os.path.isdir(args.inputs[0]) else None)
+    except (OSError, ValueError) as e:
+        if journal:
+            journal.close()
+        print(f"Kesalahan: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    ocr_cache = None
+    if not args.no_ocr_cache:
+        cache_path = config.get("Settings", "ocr_cache_path", fallback=OCR_CACHE_FILE)
+        try:
+            max_mb = config.getint("Settings", "ocr_cache_max_mb", fallback=OCR_CACHE_DEFAULT_MAX_MB)
+            ocr_cache = OcrDiskCache(cache_path, max_mb * 1024 * 1024)
+        except (ValueError, sqlite3.Error) as e:
+            print(f"Peringatan: gagal membuka cache OCR '{cache_path}': {e}. OCR berjalan tanpa cache.", file=sys.stderr)
+
+    try:
+        diagnosis_region = DiagnosisRegion.parse(
+            args.diagnosis_region if args.diagnosis_region is not None else config.get("Settings", "diagnosis_region", fallback=""))
+    except ValueError as e:
+        parser.error(str(e))
+    rule_index = RuleIndex(validation_rules)
+    for pattern, error in rule_index.invalid_patterns:
+        print(f"Peringatan: pola aturan '{pattern}' tidak valid dan dilewati: {error}", file=sys.stderr)
+    keyword_headers = unique_display_headers(texts_to_find_tuples)
+    headers = RESULT_HEADERS + keyword_headers
+
+    writers = []
+    try:
+        for output_path in args.output:
+            writers.append(open_result_writer(output_path, headers))
+    except (OSError, ValueError) as e:
+        for writer in writers:
+            writer.close()
+        if journal:
+            journal.close()
+        print(f"Kesalahan: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    try:
+        collector = TimingsCollector(args.timings)
+    except OSError as e:
+        for writer in writers:
+            writer.close()
+        if journal:
+            journal.close()
+        print(f"Kesalahan: {e}", file=sys.stderr)
+        return EXIT_USAGE
+    profile_dir = tempfile.mkdtemp(prefix="verifikasi_profil_") if args.profile else None
+
+    version = settings_version(texts_to_find_tuples, validation_rules, args.dpi, args.max_dpi, diagnosis_region)
+    manifest_inputs = args.inputs or ([journal.folder] if journal.folder else [])
+    manifests = open_folder_manifests(manifest_inputs, version) if args.manifest else []
+    manifest_by_path = {pdf_path: find_manifest(manifests, pdf_path) for pdf_path in pdf_paths} if manifests else {}
+    keyword_matcher = KeywordMatcher.from_rules(texts_to_find_tuples, validation_rules)
+    row_number_by_path = {pdf_path: i + 1 for i, pdf_path in enumerate(pdf_paths)}
+    cached_results = []
+    pending_paths = []
+    for pdf_path in pdf_paths:
+        # Hasil yang sudah ada di jurnal (--resume) tidak diproses ulang; file di manifest diperiksa oleh worker
+        file_result = journal.cached_result(pdf_path, version) if args.resume else None
+        if file_result is not None:
+            cached_results.append(file_result)
+        else:
+            pending_paths.append(pdf_path)
+    jobs = ({'path': pdf_path, 'keywords': texts_to_find_tuples, 'dpi': args.dpi, 'rules': validation_rules,
+             'matcher': keyword_matcher, 'rule_index': rule_index, 'profile_dir': profile_dir,
+             'ocr_batch_pages': args.ocr_batch_pages, 'max_dpi': args.max_dpi, 'diagnosis_region': diagnosis_region,
+             'content_hash': manifest_by_path.get(pdf_path) is not None,
+             'manifest_candidate': manifest_by_path[pdf_path].reuse_candidate(pdf_path) if manifest_by_path.get(pdf_path) else None}
+            for pdf_path in pending_paths)
+
+    start_time = time.perf_counter()
+    failed_count = 0
+    done_count = 0
+    reused_count = 0
+    save_failed = False
+    try:
+        # Hasil dari jurnal ditulis lebih dulu, lalu hasil file lain saat selesai (termasuk yang dipakai ulang dari manifest)
+        results = itertools.chain(((file_result, True) for file_result in cached_results),
+                                  ((file_result, False) for file_result in
+                                   iter_job_results(jobs, args.workers, args.processes, ocr_cache, args.max_pixmaps)))
+        for file_result, reused in results:
+            done_count += 1
+            from_manifest = file_result.stats.get('reused') == 'manifest'
+            if reused or from_manifest:
+                reused_count += 1
+            if not reused:
+                if not from_manifest:
+                    collector.add(file_result.path, file_result.stats)
+                if journal:
+                    journal.record(file_result, version)
+                manifest = manifest_by_path.get(file_result.path)
+                if manifest:
+                    manifest.record(file_result)
+            started = time.perf_counter()
+            row_texts = result_row_texts(row_number_by_path[file_result.path], file_result, keyword_headers)
+            for writer in writers:
+                writer.write(row_texts, file_result)
+            collector.add_stage('export', time.perf_counter() - started)
+            if file_result.error:
+                failed_count += 1
+                print(f"[{done_count}/{len(pdf_paths)}] {file_result.path}: {file_result.error}", file=sys.stderr)
+            elif not args.quiet:
+                unchanged_note = " (dipakai ulang)" if reused or from_manifest else ""
+                print(f"[{done_count}/{len(pdf_paths)}] {file_result.path}: {row_texts[2]} | {row_texts[4]}{unchanged_note}", file=sys.stderr)
+    except KeyboardInterrupt:
+        print("Dibatalkan.", file=sys.stderr)
+        return EXIT_FATAL
+    finally:
+        started = time.perf_counter()
+        for writer in writers:
+            try:
+                writer.close()
+            except OSError as e:
+                print(f"Kesalahan saat menyimpan '{writer.path}': {e}", file=sys.stderr)
+                save_failed = True
+        collector.add_stage('export', time.perf_counter() - started)
+        collector.close()
+        if ocr_cache:
+            try:
+                ocr_cache.flush()
+            except sqlite3.Error:
+                pass
+        if journal:
+            journal.close()
+        for manifest in manifests:
+            try:
+                manifest.close()
+            except sqlite3.Error as e:
+                print(f"Peringatan: gagal menyimpan manifest '{manifest.db_path}': {e}", file=sys.stderr)
+        if profile_dir:
+            if not merge_profiles(profile_dir, args.profile):
+                print("Peringatan: tidak ada profil yang terekam.", file=sys.stderr)
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+    if save_failed:
+        return EXIT_FATAL
+    elapsed = time.perf_counter() - start_time
+    if not args.quiet:
+        for line in collector.summary_lines():
+            print(line, file=sys.stderr)
+    unchanged_note = f", {reused_count} dipakai ulang (jurnal/manifest)" if reused_count else ""
+    print(f"Selesai: {done_count} file dalam {elapsed:.1f} detik, {failed_count} gagal{unchanged_note}.", file=sys.stderr)
+    return EXIT_FILE_ERRORS if failed_count else EXIT_OK
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1820 @@
+"""Mesin verifikasi berkas klaim PDF tanpa ketergantungan pada PyQt.
+
+Berisi ekstraksi teks/OCR per halaman, pencocokan kata kunci, indeks aturan validasi dan worker
+per file. Dipakai oleh GUI (Verifikasi.py), mode baris perintah (verifikasi_cli.py) dan proses pool.
+"""
+import sys
+import os
+import re
+import json
+import math
+import time
+import sqlite3
+import heapq
+import hashlib
+import tempfile
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# PyMuPDF, Pillow, pytesseract dan tesserocr baru diimpor oleh load_dependencies() saat pertama dibutuhkan,
+# sehingga modul ini bisa diimpor cepat (CLI --help, benchmark, proses pool) tanpa biaya impor ~250 ms.
+# cProfile/pstats dan multiprocessing juga baru diimpor di jalur profil dan proses pool yang memakainya.
+fitz = None
+Image = None
+pytesseract_module = None
+tesserocr_module = None
+TesseractNotFoundError = EnvironmentError
+_dependencies_loaded = False
+_dependencies_lock = threading.Lock()
+
+def load_dependencies():
+    """Mengimpor PyMuPDF, Pillow, pytesseract dan tesserocr sekali saja. Yang tidak terinstal tetap bernilai None."""
+    global fitz, Image, pytesseract_module, tesserocr_module, TesseractNotFoundError, _dependencies_loaded
+    if _dependencies_loaded:
+        return
+    with _dependencies_lock:
+        if _dependencies_loaded:
+            return
+        try:
+            import fitz as fitz_module # PyMuPDF
+            fitz = fitz_module
+        except ImportError:
+            fitz = None
+        try:
+            from PIL import Image as image_module
+            Image = image_module
+        except ImportError:
+            Image = None
+        try:
+            import pytesseract as tesseract_module
+            pytesseract_module = tesseract_module
+            TesseractNotFoundError = tesseract_module.TesseractNotFoundError
+        except ImportError:
+            pytesseract_module = None
+        try:
+            import tesserocr as tesserocr_import
+            tesserocr_module = tesserocr_import
+        except ImportError:
+            tesserocr_module = None
+        _dependencies_loaded = True
+
+# --- Mesin OCR ---
+# Setiap mesin menyediakan detect_orientation(gambar) -> sudut rotasi atau None, dan image_to_text(gambar) -> teks.
+# Opsional: images_to_texts(gambar-gambar) untuk batch, image_to_text_and_confidence(gambar) -> (teks, keyakinan 0-100).
+OCR_BACKEND_NAMES = ('auto', 'tesserocr', 'pytesseract')
+
+class PytesseractBackend:
+    """Memanggil tesseract.exe lewat pytesseract: satu proses baru (dan muat ulang model bahasa) per panggilan."""
+    name = 'pytesseract'
+
+    def __init__(self, tesseract_cmd):
+        self.tesseract_cmd = tesseract_cmd
+        pytesseract_module.pytesseract.tesseract_cmd = tesseract_cmd
+
+    def detect_orientation(self, image):
+        osd_data = pytesseract_module.image_to_osd(image)
+        rotation_angle_match = re.search(r"Rotate: (\d+)", osd_data)
+        return int(rotation_angle_match.group(1)) if rotation_angle_match else None
+
+    def image_to_text(self, image):
+        return pytesseract_module.image_to_string(image, config=OCR_CONFIG)
+
+    def images_to_texts(self, images):
+        """Satu proses tesseract untuk beberapa gambar: tesseract membaca daftar file gambar dan memisahkan teks
+        setiap gambar dengan form feed, jadi biaya start-up dan pemuatan model bahasa hanya dibayar sekali."""
+        with tempfile.TemporaryDirectory(prefix="verifikasi_ocr_") as temp_dir:
+            image_paths = []
+            for i, image in enumerate(images):
+                image_path = os.path.join(temp_dir, f"halaman_{i}.png")
+                image.save(image_path)
+                image_paths.append(image_path)
+            list_path = os.path.join(temp_dir, "daftar.txt")
+            with open(list_path, 'w', encoding='utf-8') as f:
+                f.write("\n".join(image_paths) + "\n")
+            output_base = os.path.join(temp_dir, "hasil")
+            pytesseract_module.pytesseract.run_tesseract(list_path, output_base, 'txt', lang=None, config=OCR_CONFIG)
+            with open(output_base + ".txt", encoding='utf-8') as f:
+                output = f.read()
+        texts = output.split("\f")
+        if len(texts) < len(images):
+            # Pemisah halaman tidak lengkap: nomor halaman tidak bisa dipastikan, ulangi per gambar
+            return [self.image_to_text(image) for image in images]
+        return texts[:len(images)]
+
+class TesserocrBackend:
+    """OCR di dalam proses dengan tesserocr. Setiap thread worker memegang satu instance API selama hidupnya,
+    jadi model bahasa dimuat sekali saja; tesserocr melepas GIL selama pengenalan sehingga thread berjalan paralel."""
+    name = 'tesserocr'
+
+    def __init__(self, tesseract_cmd=None):
+        self.tesseract_cmd = tesseract_cmd
+        self.tessdata_path = None
+        if tesseract_cmd and os.path.isdir(os.path.join(os.path.dirname(tesseract_cmd), "tessdata")):
+            self.tessdata_path = os.path.join(os.path.dirname(tesseract_cmd), "tessdata")
+        self._local = threading.local()
+        # Gagal lebih awal (RuntimeError) jika model bahasa tidak bisa dimuat
+        self._get_api('text_api', OCR_LANGUAGES, tesserocr_module.PSM.AUTO)
+
+    def _get_api(self, attribute, lang, psm):
+        api = getattr(self._local, attribute, None)
+        if api is None:
+            if self.tessdata_path:
+                api = tesserocr_module.PyTessBaseAPI(path=self.tessdata_path, lang=lang, psm=psm)
+            else:
+                api = tesserocr_module.PyTessBaseAPI(lang=lang, psm=psm)
+            setattr(self._local, attribute, api)
+        return api
+
+    def detect_orientation(self, image):
+        api = self._get_api('osd_api', 'osd', tesserocr_module.PSM.OSD_ONLY)
+        api.SetImage(image)
+        osd_result = api.DetectOrientationScript()
+        if not osd_result:
+            return None
+        # Sama dengan "Rotate:" pada keluaran OSD tesseract.exe
+        return (360 - osd_result['orient_deg']) % 360
+
+    def image_to_text(self, image):
+        return self.image_to_text_and_confidence(image)[0]
+
+    def image_to_text_and_confidence(self, image):
+        """Teks beserta rata-rata keyakinan OCR (0-100) dari pengenalan yang sama, tanpa biaya tambahan."""
+        api = self._get_api('text_api', OCR_LANGUAGES, tesserocr_module.PSM.AUTO)
+        api.SetImage(image)
+        return api.GetUTF8Text(), api.MeanTextConf()
+
+# Diisi oleh configure_tesseract()/set_ocr_backend(); None berarti OCR tidak tersedia
+ocr_backend = None
+
+def set_ocr_backend(backend):
+    global ocr_backend
+    ocr_backend = backend
+
+def configure_tesseract(tesseract_cmd, backend_name='auto'):
+    """Memilih mesin OCR. 'auto' memakai tesserocr jika terinstal dan modelnya bisa dimuat, lalu pytesseract sebagai
+    cadangan. Mengembalikan mesin yang aktif, atau None jika OCR tidak tersedia."""
+    load_dependencies()
+    backend = None
+    if backend_name in ('auto', 'tesserocr') and tesserocr_module is not None:
+        try:
+            backend = TesserocrBackend(tesseract_cmd)
+        except RuntimeError:
+            backend = None
+    if backend is None and backend_name in ('auto', 'pytesseract') and tesseract_cmd and pytesseract_module is not None:
+        backend = PytesseractBackend(tesseract_cmd)
+    set_ocr_backend(backend)
+    return backend
+
+def get_tesseract_cmd():
+    return getattr(ocr_backend, 'tesseract_cmd', None)
+
+def get_ocr_backend_name():
+    return ocr_backend.name if ocr_backend else None
+
+def get_resource_path(relative_path):
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+# --- KONSTANTA PENTING ---
+EXTRACTION_KEYWORD_PRIMARY = "Diagnosa"
+REGEX_EXTRACTION_PRIMARY = re.compile(
+    rf"{EXTRACTION_KEYWORD_PRIMARY}(?:\s*Utama|\s*\d\.?)?\s*[:;,-]?\s*(.*?)(?={EXTRACTION_KEYWORD_PRIMARY}(?:\s*Sekunder|\s*\d\.?)?|Validasi hasil|\Z)",
+    re.IGNORECASE | re.DOTALL
+)
+REGEX_SPLIT_DIAGNOSA = re.compile(r"^(\s*([a-zA-Z]\d{2}(?:\.\d{1,2})?))(?:\s*-\s*|\s*)(.*)", re.IGNORECASE)
+REGEX_BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+REGEX_DISCHARGE_PLANNING = re.compile(r'\b(kriteria\s+discharge\s+planing|rm\s*29|permintaan\s+rawat\s+inap|discharge\s+planing)\b', re.IGNORECASE | re.DOTALL)
+OCR_LANGUAGES = 'eng+ind'
+OCR_CONFIG = f'--psm 3 -l {OCR_LANGUAGES}'
+ADAPTIVE_DEFAULT_MAX_DPI = 300    # DPI adaptif: DPI tinggi untuk OCR ulang jika tidak diatur
+ADAPTIVE_MIN_CHARS = 100          # DPI adaptif: hasil OCR lebih pendek dari ini dianggap lemah
+ADAPTIVE_MIN_CONFIDENCE = 60      # DPI adaptif: keyakinan rata-rata di bawah ini dianggap lemah (jika mesin menyediakannya)
+KEYWORD_AUTOMATON_MIN = 100       # kata kunci sebanyak ini atau lebih: pakai pyahocorasick jika terinstal
+OCR_BATCH_PAGES = 4               # halaman scan per panggilan tesseract.exe (pytesseract); 1 = tanpa batch
+OCR_CACHE_FILE = "ocr_cache.sqlite"
+OCR_CACHE_DEFAULT_MAX_MB = 512
+PAGE_TEXT_CACHE_DEFAULT_MAX_MB = 256   # batas terpisah untuk teks halaman tersimpan (verifikasi ulang)
+OCR_CACHE_TOUCH_SECONDS = 3600    # waktu pakai entri cache hanya diperbarui jika lebih lama dari ini
+OCR_CACHE_EVICT_CHUNK = 500       # entri cache yang dibaca per langkah saat membuang entri lama
+OCR_CACHE_TOUCH_BATCH = 200       # pembaruan waktu pakai ditulis per transaksi sebanyak ini (atau saat flush/put)
+MANIFEST_FILE_NAME = ".verifikasi_manifest.sqlite"
+MANIFEST_COMMIT_EVERY = 200       # penulisan manifest dikumpulkan per transaksi sebanyak ini
+JOURNAL_FILE = "verifikasi_jurnal.jsonl"
+RESULT_HEADERS = ["NO.", "NAMA\nFILE", "KODE\nDIAGNOSA", "KETERANGAN\nDIAGNOSA", "VALIDASI\nATURAN", "Permintaan\nRanap"]
+
+def file_content_hash(file_path):
+    sha1 = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+# --- Cache OCR Persisten di Disk (SQLite) ---
+class OcrDiskCache:
+    """Menyimpan hasil OCR per halaman, dikunci dengan hash isi PDF, nomor halaman, DPI dan konfigurasi OCR.
+
+    Tabel page_texts menyimpan teks halaman yang sudah dibaca per file (dikunci path, ukuran dan waktu ubah) untuk
+    verifikasi ulang. Tabel ini punya batas sendiri (page_text_max_bytes), jadi teks yang murah dibaca ulang tidak
+    pernah membuang hasil OCR yang mahal; masing-masing dibuang menurut waktu pakai terakhir.
+    """
+
+    def __init__(self, db_path, max_bytes, page_text_max_bytes=PAGE_TEXT_CACHE_DEFAULT_MAX_MB * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.page_text_max_bytes = page_text_max_bytes
+        self._lock = threading.Lock()
+        self._file_hashes = {}
+        self._pending_touches = []      # [(waktu, kunci...)] pembaruan last_used ocr_pages yang belum ditulis
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_pages ("
+            "file_hash TEXT NOT NULL, page_num INTEGER NOT NULL, dpi INTEGER NOT NULL, ocr_config TEXT NOT NULL, "
+            "text TEXT NOT NULL, rotation INTEGER NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, "
+            "PRIMARY KEY (file_hash, page_num, dpi, ocr_config))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ocr_pages_last_used ON ocr_pages (last_used)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_texts ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, settings TEXT NOT NULL, "
+            "record TEXT NOT NULL, bytes INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_page_texts_last_used ON page_texts (last_used)")
+        # Ukuran per tabel disimpan di database dan diubah dalam transaksi yang sama dengan penulisan, jadi semua proses
+        # pool yang membuka cache ini melihat total yang sama (bukan hitungan masing-masing)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_size (name TEXT PRIMARY KEY, bytes INTEGER NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO cache_size SELECT 'ocr_pages', COALESCE(SUM(size), 0) FROM ocr_pages")
+        self._conn.execute("INSERT OR IGNORE INTO cache_size SELECT 'page_texts', COALESCE(SUM(bytes), 0) FROM page_texts")
+        self._conn.commit()
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return self._stored_bytes('ocr_pages') + self._stored_bytes('page_texts')
+
+    def _stored_bytes(self, table):
+        return self._conn.execute("SELECT bytes FROM cache_size WHERE name=?", (table,)).fetchone()[0]
+
+    def _add_bytes(self, table, delta):
+        self._conn.execute("UPDATE cache_size SET bytes = bytes + ? WHERE name=?", (delta, table))
+
+    def file_hash(self, file_path):
+        stat = os.stat(file_path)
+        memo_key = (file_path, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if memo_key in self._file_hashes:
+                return self._file_hashes[memo_key]
+        digest = file_content_hash(file_path)
+        with self._lock:
+            self._file_hashes[memo_key] = digest
+        return digest
+
+    def get(self, file_hash, page_num, dpi, ocr_config=OCR_CONFIG):
+        key = (file_hash, page_num, dpi, ocr_config)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, rotation, last_used FROM ocr_pages WHERE file_hash=? AND page_num=? AND dpi=? AND ocr_config=?", key
+            ).fetchone()
+            if row is None:
+                return None
+            # Urutan LRU cukup kasar: entri yang baru dipakai tidak ditulis ulang, sisanya dikumpulkan per transaksi
+            now = time.time()
+            if now - row[2] > OCR_CACHE_TOUCH_SECONDS:
+                self._pending_touches.append((now,) + key)
+                if len(self._pending_touches) >= OCR_CACHE_TOUCH_BATCH:
+                    self._write_touches()
+                    self._conn.commit()
+        return row[0], row[1]
+
+    def _write_touches(self):
+        self._conn.executemany(
+            "UPDATE ocr_pages SET last_used=? WHERE file_hash=? AND page_num=? AND dpi=? AND ocr_config=?", self._pending_touches
+        )
+        self._pending_touches = []
+
+    def flush(self):
+        """Menulis pembaruan waktu pakai yang masih tertunda (dipanggil setelah batch/job selesai)."""
+        with self._lock:
+            if self._pending_touches:
+                self._write_touches()
+                self._conn.commit()
+
+    def contains(self, file_hash, page_num, dpi, ocr_config=OCR_CONFIG):
+        """Apakah halaman ini ada di cache; hanya membaca (tidak memperbarui waktu pakai, tanpa commit)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM ocr_pages WHERE file_hash=? AND page_num=? AND dpi=? AND ocr_config=?",
+                (file_hash, page_num, dpi, ocr_config)
+            ).fetchone() is not None
+
+    def get_rotation(self, file_hash, page_num):
+        """Orientasi yang pernah terdeteksi untuk halaman ini (DPI/konfigurasi apa pun), atau None."""
+        with self._lock:
+            row = self._conn.execute(
+                # Entri OCR area (region_ocr_config) tidak dipakai: orientasinya hanya tebakan murah, bukan hasil OSD
+                "SELECT rotation FROM ocr_pages WHERE file_hash=? AND page_num=? AND instr(ocr_config, ?)=0 LIMIT 1",
+                (file_hash, page_num, REGION_OCR_CONFIG_MARKER)
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, file_hash, page_num, dpi, text, rotation, ocr_config=OCR_CONFIG):
+        size = len(text.encode('utf-8')) + 64
+        key = (file_hash, page_num, dpi, ocr_config)
+        with self._lock:
+            old_row = self._conn.execute(
+                "SELECT size FROM ocr_pages WHERE file_hash=? AND page_num=? AND dpi=? AND ocr_config=?", key
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ocr_pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)", key + (text, rotation, size, time.time())
+            )
+            if self._pending_touches:
+                # Ikut transaksi yang sama, tanpa commit tambahan
+                self._write_touches()
+            self._add_bytes('ocr_pages', size - (old_row[0] if old_row else 0))
+            if self._stored_bytes('ocr_pages') > self.max_bytes:
+                self._evict_least_recently_used('ocr_pages', 'size', self.max_bytes)
+            self._conn.commit()
+
+    def get_page_texts(self, pdf_path, settings):
+        """StoredPageTexts yang tersimpan untuk file ini jika file dan pengaturan OCR-nya belum berubah, atau None."""
+        signature = file_signature(pdf_path)
+        if signature is None:
+            return None
+        path = os.path.abspath(pdf_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, settings, record, last_used FROM page_texts WHERE path=?", (path,)
+            ).fetchone()
+            if row is None or tuple(row[:2]) != signature or row[2] != settings:
+                return None
+            now = time.time()
+            if now - row[4] > OCR_CACHE_TOUCH_SECONDS:
+                self._conn.execute("UPDATE page_texts SET last_used=? WHERE path=?", (now, path))
+                self._conn.commit()
+        record = json.loads(row[3])
+        page_texts = {int(page_num): text for page_num, text in record['page_texts'].items()}
+        return StoredPageTexts(record['code'], record['description'], record['page_count'], page_texts, signature)
+
+    def put_page_texts(self, pdf_path, settings, stored):
+        """Menyimpan (mengganti) teks halaman satu file; ditulis oleh worker agar teks tidak disimpan di memori GUI."""
+        if stored.signature is None:
+            return
+        record = json.dumps({'code': stored.code, 'description': stored.description, 'page_count': stored.page_count,
+                             'page_texts': stored.page_texts}, ensure_ascii=False, separators=(',', ':'))
+        size = len(record.encode('utf-8'))
+        path = os.path.abspath(pdf_path)
+        with self._lock:
+            old_row = self._conn.execute("SELECT bytes FROM page_texts WHERE path=?", (path,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO page_texts VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (path,) + tuple(stored.signature) + (settings, record, size, time.time()))
+            self._add_bytes('page_texts', size - (old_row[0] if old_row else 0))
+            if self._stored_bytes('page_texts') > self.page_text_max_bytes:
+                self._evict_least_recently_used('page_texts', 'bytes', self.page_text_max_bytes)
+            self._conn.commit()
+
+    def _evict_least_recently_used(self, table, size_column, max_bytes):
+        # Buang entri tabel ini yang paling lama tidak dipakai sampai ukurannya turun ke 90% batasnya
+        target_bytes = int(max_bytes * 0.9)
+        if table == 'ocr_pages' and self._pending_touches:
+            self._write_touches()
+        excess_bytes = self._stored_bytes(table) - target_bytes
+        while excess_bytes > 0:
+            # Dibaca per potongan lewat indeks last_used, bukan seluruh isi tabel
+            rows = self._conn.execute(
+                f"SELECT rowid, {size_column} FROM {table} ORDER BY last_used LIMIT ?", (OCR_CACHE_EVICT_CHUNK,)
+            ).fetchall()
+            if not rows:
+                break
+            evicted_rowids = []
+            evicted_bytes = 0
+            for rowid, size in rows:
+                if excess_bytes <= 0:
+                    break
+                evicted_rowids.append((rowid,))
+                evicted_bytes += size
+                excess_bytes -= size
+            self._conn.executemany(f"DELETE FROM {table} WHERE rowid=?", evicted_rowids)
+            self._add_bytes(table, -evicted_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM ocr_pages")
+            self._conn.execute("DELETE FROM page_texts")
+            self._conn.execute("UPDATE cache_size SET bytes = 0")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+
+# --- Manifest Per Folder: Lewati File yang Tidak Berubah ---
+def settings_version(texts_to_find_tuples, validation_rules, dpi, max_dpi=None, diagnosis_region=None):
+    """Versi kata kunci, aturan dan pengaturan OCR. Hasil di manifest hanya dipakai ulang jika versinya sama.
+    Mesin OCR yang aktif ikut dihitung (None = OCR tidak tersedia), jadi hasil file scan yang dibaca tanpa OCR
+    tidak dipakai lagi setelah Tesseract terpasang. Begitu juga mode area diagnosa (OCR area halaman 1)."""
+    payload = json.dumps([[list(pair) for pair in texts_to_find_tuples], [list(rule) for rule in validation_rules],
+                          dpi, max_dpi, OCR_CONFIG, get_ocr_backend_name(), diagnosis_region_setting(diagnosis_region)])
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+class ManifestCandidate:
+    """Sidik jari satu file di manifest, dikirim bersama job. Worker memeriksa apakah file belum berubah lalu membaca
+    hasilnya dari manifest, jadi thread GUI tidak perlu stat/hash setiap file."""
+    __slots__ = ('db_path', 'key', 'size', 'mtime_ns', 'content_hash', 'version')
+
+    def __init__(self, db_path, key, size, mtime_ns, content_hash, version):
+        self.db_path = db_path
+        self.key = key
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.content_hash = content_hash
+        self.version = version
+
+    def cached_result(self, pdf_path):
+        """FileResult terakhir jika file tidak berubah, atau None jika file harus diproses."""
+        signature = file_signature(pdf_path)
+        if signature is None or signature[0] != self.size:
+            return None
+        reused_signature = None
+        if signature[1] != self.mtime_ns:
+            # Waktu ubah berbeda tapi ukuran sama (mis. disalin ulang): bandingkan isinya
+            if not self.content_hash:
+                return None
+            try:
+                if file_content_hash(pdf_path) != self.content_hash:
+                    return None
+            except OSError:
+                return None
+            reused_signature = signature
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                row = conn.execute("SELECT result FROM files WHERE path=? AND version=?", (self.key, self.version)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        file_result = FileResult.from_record(pdf_path, json.loads(row[0]))
+        file_result.content_hash = self.content_hash
+        file_result.stats['reused'] = 'manifest'
+        file_result.stats['reused_signature'] = reused_signature
+        return file_result
+
+class FolderManifest:
+    """Sidik jari (ukuran, waktu ubah, hash isi) dan hasil terakhir setiap PDF di satu folder, disimpan di
+    MANIFEST_FILE_NAME dalam folder itu. Saat dibuka hanya sidik jari yang dimuat; hasil dibaca per file saat dipakai.
+
+    Hanya dipakai dari thread pemanggil (GUI/CLI), bukan dari worker, jadi aman ditulis sementara worker berjalan.
+    Worker hanya membaca hasil lewat koneksinya sendiri (ManifestCandidate).
+    Penulisan dikumpulkan per MANIFEST_COMMIT_EVERY file; manifest yang terputus tetap konsisten (SQLite).
+    """
+    def __init__(self, folder, version):
+        self.folder = folder
+        self.version = version
+        self.db_path = os.path.join(folder, MANIFEST_FILE_NAME)
+        self.hits = 0
+        self._pending_writes = 0
+        self._conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, content_hash TEXT, "
+            "version TEXT NOT NULL, result TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self.fingerprints = {row[0]: row[1:] for row in self._conn.execute("SELECT path, size, mtime_ns, content_hash, version FROM files")}
+
+    def _key(self, pdf_path):
+        # Path relatif terhadap folder agar manifest tetap berlaku jika folder dipindah
+        return os.path.relpath(pdf_path, self.folder).replace(os.sep, '/')
+
+    def reuse_candidate(self, pdf_path):
+        """ManifestCandidate jika manifest punya hasil file ini untuk versi pengaturan yang sama, atau None.
+        Hanya pencarian di memori; stat/hash file dan pembacaan hasil dilakukan worker (ManifestCandidate.cached_result)."""
+        key = self._key(pdf_path)
+        fingerprint = self.fingerprints.get(key)
+        if fingerprint is None or fingerprint[3] != self.version:
+            return None
+        return ManifestCandidate(self.db_path, key, *fingerprint)
+
+    def record(self, file_result):
+        """Menyimpan hasil file yang berhasil diproses. File yang gagal tidak dicatat agar diproses lagi."""
+        key = self._key(file_result.path)
+        reused_signature = file_result.stats.get('reused_signature')
+        if file_result.stats.get('reused') == 'manifest':
+            # Hasil dari manifest sendiri: cukup perbarui waktu ubah jika isi file ternyata sama
+            if reused_signature and key in self.fingerprints:
+                self._conn.execute("UPDATE files SET mtime_ns=? WHERE path=?", (reused_signature[1], key))
+                self.fingerprints[key] = tuple(reused_signature) + self.fingerprints[key][2:]
+                self._count_write()
+            return
+        signature = file_signature(file_result.path)
+        if file_result.error or signature is None:
+            return
+        self._conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                           (key,) + signature + (file_result.content_hash, self.version,
+                                                 json.dumps(file_result.to_record(), ensure_ascii=False, separators=(',', ':'))))
+        self.fingerprints[key] = signature + (file_result.content_hash, self.version)
+        self._count_write()
+
+    def _count_write(self):
+        self._pending_writes += 1
+        if self._pending_writes >= MANIFEST_COMMIT_EVERY:
+            self._conn.commit()
+            self._pending_writes = 0
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+# --- Jurnal Batch: Melanjutkan Setelah Crash atau Jendela Ditutup ---
+class ResultJournal:
+    """Jurnal append-only (JSON Lines) berisi hasil akhir setiap file segera setelah file itu selesai. Baris pertama
+    mencatat daftar file batch, jadi batch bisa dilanjutkan tanpa memilih folder lagi.
+
+    Setiap baris langsung di-flush dan di-fsync (selamat jika aplikasi crash atau komputer mati). Baris terakhir yang
+    terpotong dibuang saat jurnal dibuka untuk dilanjutkan. Semua path dicatat sebagai path absolut.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.file_paths = []
+        self.folder = None
+        self._entries = {}              # {path absolut: (versi pengaturan, hasil)}
+        if resume:
+            self._load()
+        self.file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(end)
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if 'batch' in entry:
+                self.file_paths = entry['batch']
+                self.folder = entry.get('folder')
+            elif 'path' in entry:
+                self._entries[os.path.abspath(entry['path'])] = (entry.get('version'), entry['result'])
+
+    def start_batch(self, file_paths, folder=None):
+        self.file_paths = [os.path.abspath(file_path) for file_path in file_paths]
+        self.folder = os.path.abspath(folder) if folder else None
+        self._append({'batch': self.file_paths, 'folder': self.folder})
+
+    def cached_result(self, pdf_path, version):
+        """FileResult yang sudah dijurnal dengan versi pengaturan yang sama, atau None jika file harus diproses."""
+        entry = self._entries.get(os.path.abspath(pdf_path))
+        if entry is None or entry[0] != version:
+            return None
+        return FileResult.from_record(pdf_path, entry[1])
+
+    def record(self, file_result, version):
+        """Mencatat hasil file yang berhasil diproses. File yang gagal tidak dicatat agar diproses lagi saat dilanjutkan."""
+        if file_result.error:
+            return
+        path = os.path.abspath(file_result.path)
+        record = file_result.to_record()
+        self._entries[path] = (version, record)
+        self._append({'path': path, 'version': version, 'result': record})
+
+    def _append(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+
+# --- Waktu Per Tahap ---
+# Tahap yang dicatat di stats['stage_seconds']/['stage_counts']. 'prescan' mencakup teks/OCR halaman 1, jadi tumpang
+# tindih dengan 'text'/'ocr'. 'export' dan 'ui' diukur oleh pemanggil (CLI, benchmark, GUI), bukan oleh worker.
+STAGES = ('open', 'prescan', 'text', 'render', 'osd', 'ocr', 'match', 'validate', 'export', 'ui')
+
+class StageTimings:
+    """Total detik dan jumlah panggilan per tahap."""
+    __slots__ = ('seconds', 'counts')
+
+    def __init__(self):
+        self.seconds = {}
+        self.counts = {}
+
+    def add(self, stage, started):
+        self.add_seconds(stage, time.perf_counter() - started)
+
+    def add_seconds(self, stage, seconds, count=1):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        self.counts[stage] = self.counts.get(stage, 0) + count
+
+# --- Orientasi Halaman Scan ---
+OSD_MAX_SIDE = 1200               # OSD dijalankan pada thumbnail dengan sisi terpanjang sebesar ini
+ORIENTATION_MIN_CHARS = 20        # hasil OCR lebih pendek dari ini dengan orientasi tebakan -> periksa ulang dengan OSD
+ORIENTATION_MIN_WORDS = 3         # hasil OCR dengan kata nyata lebih sedikit dari ini -> periksa ulang dengan OSD
+# Kata nyata: minimal 3 huruf dan mengandung huruf vokal; OCR halaman terbalik biasanya hanya menghasilkan tanda baca,
+# angka dan potongan huruf acak
+REGEX_REAL_WORD = re.compile(r'\b(?=[^\W\d_]*[aiueoAIUEO])[^\W\d_]{3,}\b')
+
+def needs_orientation_check(text):
+    """Apakah teks hasil OCR dengan orientasi tebakan terlalu pendek atau tidak berisi kata nyata, sehingga
+    tebakannya (mis. dari halaman sebelumnya) perlu dipastikan dengan OSD."""
+    if len(text.strip()) < ORIENTATION_MIN_CHARS:
+        return True
+    real_words = 0
+    for _ in REGEX_REAL_WORD.finditer(text):
+        real_words += 1
+        if real_words >= ORIENTATION_MIN_WORDS:
+            return False
+    return True
+
+class PageOrientation:
+    """Orientasi halaman scan dalam satu dokumen. Sinyal murah dulu (/Rotate, rasio sisi, halaman sebelumnya);
+    OSD hanya dijalankan jika sinyal tersebut tidak meyakinkan."""
+
+    def __init__(self):
+        self.angle_by_page = {}
+        self.last_angle_by_shape = {}
+
+    @staticmethod
+    def _shape(page):
+        return 'landscape' if page.rect.width > page.rect.height else 'portrait'
+
+    def guess(self, page):
+        """Sudut rotasi dari sinyal murah, atau None jika OSD diperlukan."""
+        if page.number in self.angle_by_page:
+            return self.angle_by_page[page.number]
+        if page.rotation:
+            # /Rotate sudah diterapkan saat render, jadi gambar tampil tegak seperti di penampil PDF
+            return 0
+        shape = self._shape(page)
+        if shape in self.last_angle_by_shape:
+            # Satu bundel hasil scanner biasanya berorientasi sama dengan halaman sebelumnya yang bentuknya sama
+            return self.last_angle_by_shape[shape]
+        # Formulir klaim berbentuk potret: halaman potret dianggap tegak, halaman lanskap perlu OSD
+        return 0 if shape == 'portrait' else None
+
+    def remember(self, page, angle):
+        self.angle_by_page[page.number] = angle
+        self.last_angle_by_shape[self._shape(page)] = angle
+
+def detect_orientation(img, timings):
+    """OSD pada thumbnail. Mengembalikan sudut rotasi, atau None jika OSD gagal (mis. teks terlalu sedikit)."""
+    started = time.perf_counter()
+    thumbnail = img
+    if max(img.size) > OSD_MAX_SIDE:
+        thumbnail = img.copy()
+        thumbnail.thumbnail((OSD_MAX_SIDE, OSD_MAX_SIDE))
+    try:
+        return ocr_backend.detect_orientation(thumbnail)
+    except TesseractNotFoundError:
+        raise
+    except Exception:
+        return None
+    finally:
+        timings.add('osd', started)
+
+def _image_to_text(img, angle, timings):
+    return _images_to_texts([img], [angle], timings)[0]
+
+def _images_to_texts(images, angles, timings):
+    """Mengembalikan [(teks, keyakinan)]; keyakinan None jika mesin OCR tidak menyediakannya."""
+    started = time.perf_counter()
+    images = [img.rotate(-angle, expand=True) if angle else img for img, angle in zip(images, angles)]
+    if len(images) > 1 and hasattr(ocr_backend, 'images_to_texts'):
+        results = [(text, None) for text in ocr_backend.images_to_texts(images)]
+    elif hasattr(ocr_backend, 'image_to_text_and_confidence'):
+        results = [ocr_backend.image_to_text_and_confidence(img) for img in images]
+    else:
+        results = [(ocr_backend.image_to_text(img), None) for img in images]
+    timings.add_seconds('ocr', time.perf_counter() - started, len(images))
+    return results
+
+# --- Batas Gambar Halaman di Memori ---
+PIXMAPS_PER_WORKER = 2            # default batas gambar halaman yang hidup bersamaan, dikali jumlah worker
+
+def create_pixmap_slots(limit, mp_context=None):
+    """Semaphore untuk paling banyak limit gambar halaman, satu per penjadwal/pool (bukan global) agar worker dari batch
+    yang dibatalkan tidak melepas slot ke batch berikutnya; mp_context untuk dibagi ke proses anak."""
+    if mp_context is not None:
+        return mp_context.BoundedSemaphore(limit)
+    return threading.BoundedSemaphore(limit)
+
+def acquire_pixmap_slots(pixmap_slots, wanted):
+    """Menunggu satu slot, lalu mengambil slot tambahan hanya jika langsung tersedia (agar worker yang sama-sama
+    memegang sebagian slot tidak saling menunggu). Mengembalikan jumlah slot yang didapat, paling sedikit 1;
+    pixmap_slots None berarti tanpa batas."""
+    if pixmap_slots is None:
+        return wanted
+    pixmap_slots.acquire()
+    acquired = 1
+    while acquired < wanted and pixmap_slots.acquire(False):
+        acquired += 1
+    return acquired
+
+def release_pixmap_slots(pixmap_slots, count):
+    if pixmap_slots is None:
+        return
+    for _ in range(count):
+        pixmap_slots.release()
+
+def render_page_image(page, dpi, timings, clip=None):
+    """Me-render halaman dalam skala abu-abu tanpa alpha (OCR tidak butuh warna, sepertiga memori RGB). Gambar PIL
+    memakai buffer pixmap secara langsung tanpa salinan, jadi pixmap yang dikembalikan harus tetap dipegang
+    selama gambarnya dipakai. clip membatasi render ke satu area halaman. Mengembalikan (gambar, pixmap)."""
+    started = time.perf_counter()
+    zoom = dpi / 72.0
+    matrix = fitz.Matrix(zoom, zoom)
+    pix = page.get_pixmap(matrix=matrix, colorspace=fitz.csGRAY, alpha=False, clip=clip)
+    img = Image.frombuffer("L", (pix.width, pix.height), pix.samples_mv, "raw", "L", pix.stride, 1)
+    timings.add('render', started)
+    return img, pix
+
+def ocr_pages(pages, dpi, timings=None, orientation=None, rotation_hints=None, pixmap_slots=None):
+    """Me-render halaman lalu menjalankan OCR dengan orientasi yang sesuai, semua halaman dalam satu panggilan mesin
+    OCR jika mesin mendukungnya. Jumlah gambar yang di-render sekaligus dibatasi oleh slot pixmap yang tersedia;
+    sisanya diproses pada putaran berikutnya. Mengembalikan [(teks, sudut rotasi, keyakinan)] sesuai urutan pages."""
+    if timings is None:
+        timings = StageTimings()
+    if orientation is None:
+        orientation = PageOrientation()
+    if rotation_hints is None:
+        rotation_hints = [None] * len(pages)
+    results = []
+    while len(results) < len(pages):
+        remaining = len(pages) - len(results)
+        acquired = acquire_pixmap_slots(pixmap_slots, remaining)
+        try:
+            end = len(results) + min(acquired, remaining)
+            results.extend(_ocr_rendered_pages(pages[len(results):end], dpi, timings, orientation,
+                                               rotation_hints[len(results):end]))
+        finally:
+            release_pixmap_slots(pixmap_slots, acquired)
+    return results
+
+def _ocr_rendered_pages(pages, dpi, timings, orientation, rotation_hints):
+    images, pixmaps, angles, guessed = [], [], [], []
+    img = pix = None
+    try:
+        for page, rotation_hint in zip(pages, rotation_hints):
+            img, pix = render_page_image(page, dpi, timings)
+            images.append(img)
+            pixmaps.append(pix)
+            angle = rotation_hint if rotation_hint is not None else orientation.guess(page)
+            guessed.append(angle is not None)
+            if angle is None:
+                angle = detect_orientation(img, timings) or 0
+            # Dicatat sekarang agar halaman berikutnya dalam batch yang sama ikut memakai tebakan ini
+            orientation.remember(page, angle)
+            angles.append(angle)
+        texts = _images_to_texts(images, angles, timings)
+
+        results = []
+        for page, img, angle, was_guessed, (text, confidence) in zip(pages, images, angles, guessed, texts):
+            if was_guessed and needs_orientation_check(text):
+                # Tebakan mungkin salah (mis. halaman terbalik, atau bundel terbalik yang tebakannya diwarisi dari halaman
+                # sebelumnya); pastikan dengan OSD dan ulangi OCR hanya jika sudutnya berbeda
+                detected_angle = detect_orientation(img, timings)
+                if detected_angle is not None and detected_angle != angle:
+                    angle = detected_angle
+                    text, confidence = _image_to_text(img, angle, timings)
+                    orientation.remember(page, angle)
+            results.append((text, angle, confidence))
+        return results
+    finally:
+        # Gambar memakai buffer pixmap, jadi dilepas lebih dulu
+        img = None
+        del images[:]
+        pix = None
+        del pixmaps[:]
+
+def get_ocr_pages_text(pages, dpi, ocr_cache, pdf_path, timings=None, orientation=None, pixmap_slots=None):
+    """OCR beberapa halaman, membaca cache disk terlebih dahulu; hanya halaman yang belum ada di cache yang di-OCR
+    (dalam satu batch). Mengembalikan [(teks, dari_cache, keyakinan)] sesuai urutan pages; keyakinan tidak disimpan
+    di cache, jadi None untuk hasil dari cache."""
+    if ocr_cache is None:
+        return [(text, False, confidence) for text, _, confidence in ocr_pages(pages, dpi, timings, orientation, pixmap_slots=pixmap_slots)]
+    file_hash = ocr_cache.file_hash(pdf_path)
+    results = [None] * len(pages)
+    missing = []
+    for i, page in enumerate(pages):
+        cached = ocr_cache.get(file_hash, page.number, dpi)
+        if cached is None:
+            missing.append(i)
+            continue
+        if orientation is not None:
+            orientation.remember(page, cached[1])
+        results[i] = (cached[0], True, None)
+    if missing:
+        # Orientasi dari OCR sebelumnya pada DPI lain tetap berlaku untuk halaman yang sama
+        rotation_hints = [ocr_cache.get_rotation(file_hash, pages[i].number) for i in missing]
+        ocr_results = ocr_pages([pages[i] for i in missing], dpi, timings, orientation, rotation_hints, pixmap_slots)
+        for i, (text, angle, confidence) in zip(missing, ocr_results):
+            ocr_cache.put(file_hash, pages[i].number, dpi, text, angle)
+            results[i] = (text, False, confidence)
+    return results
+
+def ocr_page_region(page, clip, dpi, timings=None, orientation=None, pixmap_slots=None):
+    """OCR satu area halaman saja. Hanya untuk halaman yang (menurut sinyal murah) sudah tegak, karena area dihitung
+    pada halaman tegak; mengembalikan None jika orientasinya tidak pasti atau halaman perlu diputar."""
+    if timings is None:
+        timings = StageTimings()
+    if orientation is None:
+        orientation = PageOrientation()
+    if page.rotation or orientation.guess(page) != 0:
+        return None
+    acquired = acquire_pixmap_slots(pixmap_slots, 1)
+    try:
+        img, pix = render_page_image(page, dpi, timings, clip)
+        text = _image_to_text(img, 0, timings)[0]
+        # Gambar memakai buffer pixmap, jadi dilepas lebih dulu
+        del img, pix
+        return text
+    finally:
+        release_pixmap_slots(pixmap_slots, acquired)
+
+# --- Area Blok Diagnosa di Halaman 1 ---
+REGION_OCR_CONFIG_MARKER = " region="      # penanda kolom ocr_config untuk hasil OCR area di cache OCR
+
+def region_ocr_config(box):
+    """Kunci ocr_config cache OCR untuk hasil OCR satu area (pecahan x0,y0,x1,y1), terpisah dari OCR halaman penuh."""
+    return OCR_CONFIG + REGION_OCR_CONFIG_MARKER + ",".join(f"{value:.4f}" for value in box)
+
+def diagnosis_region_setting(diagnosis_region):
+    """Mode area diagnosa untuk kunci cache/manifest: 'off', 'auto' atau area tetap 'x0,y0,x1,y1'."""
+    if diagnosis_region is None:
+        return "off"
+    if diagnosis_region.learn:
+        return "auto"
+    return ",".join(f"{value:.4f}" for value in diagnosis_region.box)
+
+class DiagnosisRegion:
+    """Area blok "Diagnosa Utama" pada halaman 1 formulir resume, sebagai pecahan lebar/tinggi halaman (x0, y0, x1, y1).
+    Bisa diatur tetap, atau dipelajari dari halaman 1 berlapis teks (mode 'auto'): area hasil belajar adalah gabungan
+    semua blok yang pernah ditemukan, jadi hanya bisa melebar."""
+    MARGIN = 0.01                   # ruang tambahan di atas/bawah blok (pecahan tinggi halaman)
+    DEFAULT_BLOCK_HEIGHT = 0.08     # tinggi blok jika tidak ada "Diagnosa Sekunder"/"Validasi hasil" di bawahnya
+
+    def __init__(self, box=None, learn=False):
+        self.box = box
+        self.learn = learn
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def parse(cls, value):
+        """'auto' atau 'x0,y0,x1,y1' (pecahan 0-1). Mengembalikan None untuk nilai kosong/'off'."""
+        value = (value or "").strip().lower()
+        if value in ("", "off"):
+            return None
+        if value == "auto":
+            return cls(learn=True)
+        try:
+            box = tuple(float(part) for part in value.split(","))
+        except ValueError:
+            box = ()
+        if len(box) != 4 or not (0 <= box[0] < box[2] <= 1 and 0 <= box[1] < box[3] <= 1):
+            raise ValueError(f"Area diagnosa tidak valid: '{value}'. Gunakan 'auto' atau x0,y0,x1,y1 (pecahan 0-1).")
+        return cls(box)
+
+    def __getstate__(self):
+        # Lock tidak bisa di-pickle (pekerjaan dikirim ke proses anak)
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def clip_for(self, page):
+        box = self.box
+        if box is None:
+            return None
+        rect = page.rect
+        return fitz.Rect(rect.x0 + box[0] * rect.width, rect.y0 + box[1] * rect.height,
+                         rect.x0 + box[2] * rect.width, rect.y0 + box[3] * rect.height)
+
+    def learn_from(self, page):
+        """Mempelajari area dari halaman 1 berlapis teks yang kode diagnosanya berhasil diambil."""
+        if not self.learn or page.rotation:
+            return
+        rect = page.rect
+        keyword_rects = sorted(page.search_for(EXTRACTION_KEYWORD_PRIMARY), key=lambda found: (found.y0, found.x0))
+        if not keyword_rects:
+            return
+        primary = keyword_rects[0]
+        # Baris penutup (Diagnosa Sekunder / Validasi hasil) ikut masuk agar regex berhenti di tempat yang sama
+        end_rects = [found for found in keyword_rects[1:] + page.search_for("Validasi hasil") if found.y0 >= primary.y1]
+        bottom = min(found.y1 for found in end_rects) if end_rects else primary.y1 + self.DEFAULT_BLOCK_HEIGHT * rect.height
+        top_fraction = max(0.0, (primary.y0 - rect.y0) / rect.height - self.MARGIN)
+        bottom_fraction = min(1.0, (bottom - rect.y0) / rect.height + self.MARGIN)
+        with self._lock:
+            if self.box is None:
+                self.box = (0.0, top_fraction, 1.0, bottom_fraction)
+            else:
+                self.box = (0.0, min(self.box[1], top_fraction), 1.0, max(self.box[3], bottom_fraction))
+            self.samples += 1
+
+# --- Pencocok Banyak Kata Kunci (Aho-Corasick) ---
+class KeywordMatcher:
+    """Menemukan semua kata kunci di teks halaman (huruf kecil).
+
+    Untuk daftar kata kunci biasa (puluhan), pemeriksaan `kata kunci in teks` per kata kunci berjalan di C dan paling
+    cepat. Automaton Aho-Corasick hanya dipakai untuk daftar besar (>= KEYWORD_AUTOMATON_MIN) dan hanya jika
+    pyahocorasick terinstal; automaton Python murni jauh lebih lambat dari pemeriksaan `in`.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = sorted({keyword.lower() for keyword in keywords if keyword})
+        self._automaton = None
+
+    @classmethod
+    def from_rules(cls, texts_to_find_tuples, validation_rules):
+        return cls([search_text for search_text, _ in texts_to_find_tuples] +
+                   [must_have_keyword for _, must_have_keyword in validation_rules])
+
+    def __getstate__(self):
+        # Automaton dibangun ulang di proses anak; yang dikirim hanya daftar kata kunci
+        return {'keywords': self.keywords}
+
+    def __setstate__(self, state):
+        self.keywords = state['keywords']
+        self._automaton = None
+
+    def _get_automaton(self):
+        if self._automaton is None:
+            self._automaton = False
+            if len(self.keywords) >= KEYWORD_AUTOMATON_MIN:
+                try:
+                    import ahocorasick
+                except ImportError:
+                    return False
+                automaton = ahocorasick.Automaton()
+                for keyword in self.keywords:
+                    automaton.add_word(keyword, keyword)
+                automaton.make_automaton()
+                self._automaton = automaton
+        return self._automaton
+
+    def find(self, text):
+        """Mengembalikan himpunan kata kunci yang muncul di teks (teks harus sudah huruf kecil)."""
+        automaton = self._get_automaton()
+        if automaton:
+            return {keyword for _, keyword in automaton.iter(text)}
+        return {keyword for keyword in self.keywords if keyword in text}
+
+def extract_diagnosis(page_1_text):
+    code_text = "Tidak Ditemukan"
+    description_text = "Tidak Ditemukan"
+    match_primary = REGEX_EXTRACTION_PRIMARY.search(page_1_text)
+    if match_primary:
+        extracted_primary_text = match_primary.group(1).strip()
+        split_match = REGEX_SPLIT_DIAGNOSA.search(extracted_primary_text)
+        if split_match:
+            code_text = split_match.group(2).strip()
+            description_text = split_match.group(3).strip()
+        else:
+            description_text = extracted_primary_text
+    return code_text, description_text
+
+# --- Indeks Aturan Validasi (dikompilasi sekali setiap aturan dimuat/diubah) ---
+class RuleIndex:
+    """Mencocokkan kode diagnosa dengan semua aturan validasi dalam satu pencarian.
+
+    Pola gabungan dipakai sebagai saringan cepat untuk kode yang tidak relevan; hasil per kode disimpan
+    karena kode ICD yang sama muncul berulang kali dalam satu folder klaim.
+    """
+
+    def __init__(self, validation_rules):
+        self.validation_rules = list(validation_rules)
+        self.invalid_patterns = []
+        self._compiled_rules = []
+        for diag_keyword_regex, must_have_keyword in self.validation_rules:
+            try:
+                self._compiled_rules.append((re.compile(diag_keyword_regex), (diag_keyword_regex, must_have_keyword)))
+            except re.error as e:
+                self.invalid_patterns.append((diag_keyword_regex, str(e)))
+        self._combined = self._compile_combined()
+        self._matches_by_code = {}
+
+    def _compile_combined(self):
+        # Pola yang sah sendiri-sendiri belum tentu sah digabung (mis. flag (?i) di tengah pola, nama grup ganda) dan
+        # referensi ke grup (\1, (?P=nama), grup bersyarat (?(1)...)/(?(nama)...)) bergeser nomornya atau bisa menunjuk
+        # grup aturan lain; tanpa pola gabungan setiap aturan dicari satu per satu
+        patterns = [pattern.pattern for pattern, _ in self._compiled_rules]
+        if not patterns or any(REGEX_BACKREFERENCE.search(pattern) for pattern in patterns):
+            return None
+        try:
+            return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+        except re.error:
+            return None
+
+    def __bool__(self):
+        return bool(self.validation_rules)
+
+    def match(self, code_text):
+        """Mengembalikan daftar aturan (regex, kata kunci) yang cocok dengan kode, sesuai urutan aturan."""
+        if not code_text or code_text == "Tidak Ditemukan" or not self._compiled_rules:
+            return []
+        code_text_lower = code_text.lower()
+        matched_rules = self._matches_by_code.get(code_text_lower)
+        if matched_rules is None:
+            if self._combined is None or self._combined.search(code_text_lower):
+                matched_rules = [rule for pattern, rule in self._compiled_rules if pattern.search(code_text_lower)]
+            else:
+                matched_rules = []
+            self._matches_by_code[code_text_lower] = matched_rules
+        return matched_rules
+
+class JobCancelledError(Exception):
+    pass
+
+# --- Kelas Worker untuk Memproses PDF (Dijalankan oleh PdfJobScheduler di thread/proses pool) ---
+class FileResult:
+    """Hasil verifikasi satu file PDF, sama untuk GUI, baris perintah dan benchmark."""
+    __slots__ = ('path', 'code', 'description', 'relevant', 'matched_rules', 'results', 'error', 'pages', 'ringkasan', 'stats',
+                 'content_hash')
+
+    def __init__(self, path, code="Tidak Ditemukan", description="Tidak Ditemukan", relevant=False, matched_rules=None,
+                 results=None, error="", pages=None, ringkasan=False, stats=None, content_hash=None):
+        self.path = path
+        self.code = code
+        self.description = description
+        self.relevant = relevant                          # False = kode diagnosa tidak cocok aturan mana pun (DILEWATI)
+        self.matched_rules = matched_rules or []          # [(regex kode diagnosa, kata kunci wajib)]
+        self.results = results or {}                      # {teks tampilan: ditemukan}
+        self.error = error
+        self.pages = pages or {}                          # {teks tampilan / KATA KUNCI ATURAN: nomor halaman}
+        self.ringkasan = ringkasan
+        self.stats = stats or {}
+        self.content_hash = content_hash                  # SHA-1 isi file, hanya jika job['content_hash'] (untuk FolderManifest)
+
+    # Isi hasil yang disimpan di manifest folder dan jurnal (tanpa path dan waktu per halaman)
+    RECORD_FIELDS = ('code', 'description', 'relevant', 'matched_rules', 'results', 'error', 'pages', 'ringkasan', 'stats')
+    # Statistik yang hanya berlaku untuk satu run (tidak ikut disimpan)
+    TRANSIENT_STATS = ('page_seconds', 'reused', 'reused_signature')
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_record(self):
+        record = {name: getattr(self, name) for name in self.RECORD_FIELDS}
+        record['stats'] = {key: value for key, value in self.stats.items() if key not in self.TRANSIENT_STATS}
+        return record
+
+    @classmethod
+    def from_record(cls, path, record):
+        return cls(path, **dict(record, matched_rules=[tuple(rule) for rule in record['matched_rules']]))
+
+# --- Teks Halaman Tersimpan untuk Verifikasi Ulang (kata kunci/aturan berubah) ---
+def file_signature(file_path):
+    """Ukuran dan waktu ubah file; teks tersimpan hanya dipakai ulang jika keduanya belum berubah."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+class StoredPageTexts:
+    """Kode diagnosa dan teks halaman yang sudah dibaca dari satu PDF, disimpan di OcrDiskCache (tabel page_texts).
+    Verifikasi ulang memakai teks ini tanpa membuka PDF; hanya halaman yang belum pernah dibaca (mis. kata kunci baru
+    tidak ada di halaman tersimpan) yang dibaca lagi."""
+    __slots__ = ('code', 'description', 'page_count', 'page_texts', 'signature')
+
+    def __init__(self, code, description, page_count, page_texts, signature):
+        self.code = code
+        self.description = description
+        self.page_count = page_count
+        self.page_texts = page_texts
+        self.signature = signature
+
+class LazyPdfDocument:
+    """Pengganti dokumen fitz untuk verifikasi ulang: PDF baru dibuka saat halaman pertama benar-benar dimuat."""
+
+    def __init__(self, pdf_path, page_count):
+        self.pdf_path = pdf_path
+        self.page_count = page_count
+        self.document = None
+
+    def load_page(self, page_num):
+        if self.document is None:
+            self.document = fitz.open(self.pdf_path)
+        return self.document.load_page(page_num)
+
+    def close(self):
+        if self.document is not None:
+            self.document.close()
+
+class PdfProcessingWorker:
+    def __init__(self, pdf_path, texts_to_find_tuples, dpi, validation_rules, code_text=None, ocr_cache=None,
+                 event_callback=None, should_stop=None, keyword_matcher=None, rule_index=None, ocr_batch_pages=OCR_BATCH_PAGES,
+                 max_dpi=None, diagnosis_region=None, pixmap_slots=None):
+        load_dependencies()
+        self.pdf_path = pdf_path
+        self.texts_to_find_tuples = texts_to_find_tuples
+        self.dpi = dpi
+        self.validation_rules = validation_rules
+        self.code_text = code_text
+        self.ocr_cache = ocr_cache
+        self.event_callback = event_callback
+        self.should_stop = should_stop
+        self.ocr_batch_pages = max(1, ocr_batch_pages)
+        # DPI adaptif: OCR pada dpi, halaman yang hasilnya lemah di-OCR ulang pada max_dpi (None = nonaktif)
+        self.max_dpi = max_dpi if max_dpi and max_dpi > dpi else None
+        self.pixmap_slots = pixmap_slots            # semaphore gambar halaman milik penjadwal/pool ini, atau None
+        self.diagnosis_region = diagnosis_region    # DiagnosisRegion untuk OCR area blok Diagnosa di halaman 1, atau None
+        self.keyword_matcher = keyword_matcher or KeywordMatcher.from_rules(texts_to_find_tuples, validation_rules)
+        self.rule_index = rule_index or RuleIndex(validation_rules)
+        # Cache teks per halaman untuk satu dokumen: setiap halaman diekstrak/di-OCR paling banyak sekali
+        self.page_text_cache = {}
+        self.ocr_page_numbers = set()
+        self.ocr_calls = 0
+        self.ocr_skipped = 0
+        self.pages_total = 0
+        self.pages_text_layer = 0
+        self.ocr_cache_hits = 0
+        self.timings = StageTimings()
+        self.orientation = PageOrientation()
+        self.page_seconds = []          # [nomor halaman, sumber teks, detik, DPI OCR atau None] untuk setiap halaman yang diekstrak
+        self.ocr_page_info = {}         # {nomor halaman: (DPI, keyakinan)} untuk halaman yang teksnya dari OCR
+        self.pages_escalated = 0
+        self.region_ocr_calls = 0
+        self.region_ocr_hits = 0
+        self.pages_reused = 0
+        self.read_ahead_pages = set()   # halaman yang di-OCR lewat read-ahead tapi (belum) diminta oleh lintasan mana pun
+
+    def _emit_event(self, *event):
+        if self.event_callback:
+            self.event_callback(event)
+
+    def _get_cached_page_text(self, document, page_num, read_ahead_step=0):
+        """Teks halaman dari cache dokumen. read_ahead_step (+1 lintasan maju, -1 lintasan mundur) mengizinkan halaman
+        scan berikutnya ke arah itu ikut di-OCR dalam batch yang sama."""
+        if self.should_stop and self.should_stop():
+            raise JobCancelledError()
+        if page_num in self.page_text_cache:
+            if page_num in self.ocr_page_numbers:
+                self.ocr_skipped += 1
+            self.read_ahead_pages.discard(page_num)
+            return self.page_text_cache[page_num]
+        for extracted_page_num, (page_text, source, seconds) in self._get_page_text(document, page_num, self.dpi, read_ahead_step).items():
+            self.page_seconds.append([extracted_page_num + 1, source, seconds, self.dpi if source.startswith('ocr') else None])
+            self.page_text_cache[extracted_page_num] = page_text
+            if extracted_page_num != page_num and source == 'ocr':
+                self.read_ahead_pages.add(extracted_page_num)
+        return self.page_text_cache[page_num]
+
+    def _get_stage_page_text(self, document, page_num, read_ahead_step, is_satisfied):
+        """Seperti _get_cached_page_text. Dalam mode DPI adaptif, halaman OCR yang hasilnya lemah dan belum memenuhi
+        kebutuhan tahap (is_satisfied(teks) bernilai False) di-OCR ulang pada max_dpi."""
+        page_text = self._get_cached_page_text(document, page_num, read_ahead_step)
+        if self._needs_higher_dpi(page_num, page_text) and not is_satisfied(page_text):
+            page_text = self._get_escalated_page_text(document, page_num)
+        return page_text
+
+    def _needs_higher_dpi(self, page_num, page_text):
+        if not self.max_dpi or self.ocr_page_info.get(page_num, (None,))[0] != self.dpi:
+            return False        # mode adaptif nonaktif, halaman berlapis teks, atau sudah di-OCR pada max_dpi
+        confidence = self.ocr_page_info[page_num][1]
+        if len(page_text.strip()) < ADAPTIVE_MIN_CHARS:
+            return True
+        if confidence is not None and confidence < ADAPTIVE_MIN_CONFIDENCE:
+            return True
+        # Keyakinan tidak disimpan di cache; hasil DPI tinggi dari proses sebelumnya menandakan halaman ini lemah
+        return self.ocr_cache is not None and self.ocr_cache.contains(self.ocr_cache.file_hash(self.pdf_path), page_num, self.max_dpi)
+
+    def _get_escalated_page_text(self, document, page_num):
+        started = time.perf_counter()
+        try:
+            (page_text, from_cache, confidence), = get_ocr_pages_text([document.load_page(page_num)], self.max_dpi, self.ocr_cache,
+                                                                        self.pdf_path, self.timings, self.orientation, self.pixmap_slots)
+        except TesseractNotFoundError:
+            raise TesseractNotFoundError("Mesin Tesseract OCR tidak ditemukan.")
+        except Exception:
+            # Hasil DPI dasar tetap dipakai
+            return self.page_text_cache[page_num]
+        self.pages_escalated += 1
+        if from_cache:
+            self.ocr_skipped += 1
+            self.ocr_cache_hits += 1
+        else:
+            self.ocr_calls += 1
+        self.ocr_page_info[page_num] = (self.max_dpi, confidence)
+        self.page_seconds.append([page_num + 1, 'ocr_cache' if from_cache else 'ocr', time.perf_counter() - started, self.max_dpi])
+        self.page_text_cache[page_num] = page_text
+        return page_text
+
+    def _get_text_layer(self, page):
+        started = time.perf_counter()
+        page_text_from_pdf = page.get_text()
+        self.timings.add('text', started)
+        if page_text_from_pdf.strip():
+            self.pages_text_layer += 1
+            return page_text_from_pdf
+        return None
+
+    def _get_ocr_batch_size(self):
+        # Hanya mesin yang membayar start-up per panggilan (pytesseract) yang diuntungkan oleh batch
+        return self.ocr_batch_pages if hasattr(ocr_backend, 'images_to_texts') else 1
+
+    def _get_page_text(self, document, page_num, dpi, read_ahead_step=0):
+        """Mengembalikan {nomor halaman: (teks, sumber, detik)} dengan sumber 'text', 'ocr', 'ocr_cache' atau 'empty'.
+        Selalu memuat page_num; jika halaman itu perlu OCR, halaman scan berikutnya yang belum dibaca bisa ikut
+        di-OCR dalam satu panggilan mesin OCR (read-ahead), masing-masing tetap dengan nomor halamannya sendiri."""
+        started = time.perf_counter()
+        page = document.load_page(page_num)
+        page_text_from_pdf = self._get_text_layer(page)
+        if page_text_from_pdf is not None:
+            return {page_num: (page_text_from_pdf, 'text', time.perf_counter() - started)}
+        
+        if not ocr_backend:
+            return {page_num: ("", 'empty', time.perf_counter() - started)}
+
+        page_texts = {}
+        batch = [page]
+        next_page_num = page_num + read_ahead_step
+        while (read_ahead_step and len(batch) < self._get_ocr_batch_size() and 0 <= next_page_num < document.page_count
+               and next_page_num not in self.page_text_cache):
+            read_ahead_started = time.perf_counter()
+            next_page = document.load_page(next_page_num)
+            next_page_text = self._get_text_layer(next_page)
+            if next_page_text is not None:
+                # Halaman berlapis teks memutus batch; teksnya disimpan agar tidak diekstrak ulang
+                page_texts[next_page_num] = (next_page_text, 'text', time.perf_counter() - read_ahead_started)
+                break
+            batch.append(next_page)
+            next_page_num += read_ahead_step
+
+        try:
+            try:
+                ocr_results = get_ocr_pages_text(batch, dpi, self.ocr_cache, self.pdf_path, self.timings, self.orientation, self.pixmap_slots)
+            except TesseractNotFoundError:
+                raise
+            except Exception:
+                if len(batch) == 1:
+                    raise
+                # Batch gagal: ulangi hanya halaman yang diminta agar kesalahannya ditangani seperti biasa
+                batch = [page]
+                ocr_results = get_ocr_pages_text(batch, dpi, self.ocr_cache, self.pdf_path, self.timings, self.orientation, self.pixmap_slots)
+        except TesseractNotFoundError:
+            raise TesseractNotFoundError("Mesin Tesseract OCR tidak ditemukan.")
+        except Exception as e:
+            if "Too few characters" in str(e) or "Error during processing." in str(e) or "Invalid resolution" in str(e):
+                self.ocr_page_numbers.add(page_num)
+                page_texts[page_num] = ("", 'empty', time.perf_counter() - started)
+                return page_texts
+            else:
+                raise Exception(f"Error serius saat OCR di halaman {page_num + 1}: {e}")
+
+        # Waktu batch dibagi rata ke halaman-halamannya
+        seconds_per_page = (time.perf_counter() - started) / len(batch)
+        for batch_page, (page_text_from_ocr, from_cache, confidence) in zip(batch, ocr_results):
+            self.ocr_page_numbers.add(batch_page.number)
+            self.ocr_page_info[batch_page.number] = (dpi, confidence)
+            if from_cache:
+                self.ocr_skipped += 1
+                self.ocr_cache_hits += 1
+                page_texts[batch_page.number] = (page_text_from_ocr, 'ocr_cache', seconds_per_page)
+            else:
+                self.ocr_calls += 1
+                page_texts[batch_page.number] = (page_text_from_ocr, 'ocr', seconds_per_page)
+        return page_texts
+
+    def _has_all_keywords(self, page_text, keyword_groups):
+        """Apakah setiap grup kata kunci punya paling sedikit satu anggota di teks halaman."""
+        found_keywords = self.keyword_matcher.find(page_text.lower())
+        return all(found_keywords.intersection(search_texts) for search_texts in keyword_groups)
+
+    def _get_diagnosis_region_text(self, document):
+        """OCR hanya area blok Diagnosa di halaman 1 scan. Mengembalikan None jika halaman 1 harus dibaca penuh:
+        berlapis teks, area belum diketahui, sudah ada di cache OCR, atau orientasinya tidak pasti."""
+        if self.diagnosis_region is None or self.diagnosis_region.box is None or not ocr_backend or 0 in self.page_text_cache:
+            return None
+        started = time.perf_counter()
+        page = document.load_page(0)
+        page_text = self._get_text_layer(page)
+        if page_text is not None:
+            # Disimpan agar pembacaan halaman penuh tidak mengekstraknya ulang
+            self.page_text_cache[0] = page_text
+            self.page_seconds.append([1, 'text', time.perf_counter() - started, None])
+            return None
+        # Area dibaca sekali di awal: dalam mode 'auto' thread lain bisa melebarkannya sementara file ini diproses
+        box = self.diagnosis_region.box
+        file_hash = None
+        if self.ocr_cache is not None:
+            file_hash = self.ocr_cache.file_hash(self.pdf_path)
+            if self.ocr_cache.contains(file_hash, 0, self.dpi):
+                return None
+            cached = self.ocr_cache.get(file_hash, 0, self.dpi, region_ocr_config(box))
+            if cached is not None:
+                self.page_seconds.append([1, 'ocr_region_cache', time.perf_counter() - started, self.dpi])
+                return cached[0]
+        try:
+            region_text = ocr_page_region(page, DiagnosisRegion(box).clip_for(page), self.dpi, self.timings, self.orientation,
+                                          self.pixmap_slots)
+        except TesseractNotFoundError:
+            raise TesseractNotFoundError("Mesin Tesseract OCR tidak ditemukan.")
+        except Exception:
+            return None
+        if region_text is not None:
+            self.region_ocr_calls += 1
+            self.page_seconds.append([1, 'ocr_region', time.perf_counter() - started, self.dpi])
+            if file_hash is not None:
+                self.ocr_cache.put(file_hash, 0, self.dpi, region_text, 0, region_ocr_config(box))
+        return region_text
+
+    def prescan(self, document):
+        """Mengambil kode dan keterangan diagnosa dari halaman 1 dokumen yang sudah terbuka. Jika area blok Diagnosa
+        diketahui, halaman 1 scan di-OCR pada area itu saja; OCR halaman penuh hanya jika regex tidak cocok di sana."""
+        if not document.page_count:
+            return extract_diagnosis("")
+        try:
+            region_text = self._get_diagnosis_region_text(document)
+            if region_text is not None:
+                code_text, description_text = extract_diagnosis(region_text)
+                if code_text != "Tidak Ditemukan":
+                    self.region_ocr_hits += 1
+                    return code_text, description_text
+            page_1_text = self._get_stage_page_text(document, 0, 0, lambda text: extract_diagnosis(text)[0] != "Tidak Ditemukan")
+        except JobCancelledError:
+            raise
+        except Exception:
+            page_1_text = ""
+        code_text, description_text = extract_diagnosis(page_1_text)
+        if code_text != "Tidak Ditemukan" and self.diagnosis_region is not None and 0 not in self.ocr_page_numbers:
+            self.diagnosis_region.learn_from(document.load_page(0))
+        return code_text, description_text
+
+    def run(self, document=None):
+        grouped_search_texts = {}
+        for search_text, display_text in self.texts_to_find_tuples:
+            grouped_search_texts.setdefault(display_text, []).append(search_text)
+
+        results = {display_text: False for display_text in grouped_search_texts.keys()}
+        found_page_numbers = {display_text: -1 for display_text in grouped_search_texts.keys()}
+
+        error_message = ""
+        owns_document = document is None
+        found_ringkasan_keyword = False
+        
+        try:
+            if owns_document:
+                document = fitz.open(self.pdf_path)
+            
+            # Lintasan maju tunggal: cari halaman discharge planning, lalu kata kunci mulai dari halaman itu.
+            # Berhenti membaca/OCR begitu tidak ada grup kata kunci yang tersisa.
+            outstanding_groups = {display_text: [search_text.lower() for search_text in search_texts]
+                                  for display_text, search_texts in grouped_search_texts.items()}
+            for page_num in range(document.page_count):
+                page_content = self._get_stage_page_text(
+                    document, page_num, 1,
+                    lambda text: (found_ringkasan_keyword or REGEX_DISCHARGE_PLANNING.search(text.lower()))
+                    and self._has_all_keywords(text, outstanding_groups.values())).lower()
+                started = time.perf_counter()
+                if not found_ringkasan_keyword:
+                    if not REGEX_DISCHARGE_PLANNING.search(page_content):
+                        self.timings.add('match', started)
+                        continue
+                    found_ringkasan_keyword = True
+                found_keywords = self.keyword_matcher.find(page_content)
+                self.timings.add('match', started)
+                for display_text, search_texts in list(outstanding_groups.items()):
+                    if found_keywords.intersection(search_texts):
+                        results[display_text] = True
+                        found_page_numbers[display_text] = page_num + 1
+                        self._emit_event('keyword', self.pdf_path, display_text, page_num + 1)
+                        del outstanding_groups[display_text]
+                if not outstanding_groups:
+                    break
+            
+            if not found_ringkasan_keyword:
+                # Bukan kesalahan pemrosesan: hasilnya tercatat sebagai Permintaan Ranap ✗
+                return self.pdf_path, {}, "", {}, found_ringkasan_keyword
+
+            # Lintasan mundur tunggal untuk semua aturan yang cocok dengan kode diagnosa (halaman terakhir yang memuat kata kunci)
+            outstanding_rule_targets = {}
+            for _, must_have_keyword in self.rule_index.match(self.code_text):
+                found_page_numbers[must_have_keyword.upper()] = -1
+                outstanding_rule_targets[must_have_keyword.upper()] = must_have_keyword.lower()
+            for i in range(document.page_count - 1, -1, -1):
+                if not outstanding_rule_targets:
+                    break
+                page_content = self._get_stage_page_text(
+                    document, i, -1, lambda text: self._has_all_keywords(text, [[target] for target in outstanding_rule_targets.values()])).lower()
+                started = time.perf_counter()
+                found_keywords = self.keyword_matcher.find(page_content)
+                self.timings.add('match', started)
+                for rule_key, must_have_keyword in list(outstanding_rule_targets.items()):
+                    if must_have_keyword in found_keywords:
+                        found_page_numbers[rule_key] = i + 1
+                        del outstanding_rule_targets[rule_key]
+
+        except JobCancelledError:
+            error_message = "Dibatalkan."
+        except fitz.FileNotFoundError:
+            error_message = "File PDF tidak ditemukan."
+        except TesseractNotFoundError:
+            error_message = "Mesin Tesseract OCR tidak ditemukan."
+        except Exception as e:
+            error_message = f"Terjadi kesalahan umum saat memproses PDF: {e}"
+        finally:
+            if document:
+                self.pages_total = document.page_count
+            if owns_document and document:
+                document.close()
+        
+        return self.pdf_path, results, error_message, found_page_numbers, found_ringkasan_keyword
+
+    def run_job(self, reuse_page_texts=False, keep_page_texts=False, content_hash=False):
+        """Pra-pindai halaman 1 lalu, jika kode diagnosa relevan, tahap kata kunci dan validasi pada dokumen yang sama.
+        Dengan reuse_page_texts dan teks halaman tersimpan di cache (StoredPageTexts) pra-pindai dilewati dan kedua
+        lintasan dijalankan ulang pada teks tersimpan; PDF hanya dibuka jika lintasan memerlukan halaman yang belum
+        pernah dibaca. Dengan keep_page_texts teks halaman yang dibaca disimpan ke cache untuk verifikasi ulang."""
+        job_started = time.perf_counter()
+        file_result = FileResult(self.pdf_path)
+        document = None
+        stored_pages = None
+        if self.ocr_cache is not None and (reuse_page_texts or keep_page_texts):
+            page_text_settings = json.dumps([self.dpi, self.max_dpi, OCR_CONFIG, get_ocr_backend_name(),
+                                             diagnosis_region_setting(self.diagnosis_region)])
+            if reuse_page_texts:
+                try:
+                    stored_pages = self.ocr_cache.get_page_texts(self.pdf_path, page_text_settings)
+                except sqlite3.Error:
+                    stored_pages = None
+        try:
+            if stored_pages is not None:
+                document = LazyPdfDocument(self.pdf_path, stored_pages.page_count)
+                self.page_text_cache.update(stored_pages.page_texts)
+                self.pages_reused = len(stored_pages.page_texts)
+                self.pages_total = stored_pages.page_count
+                self.code_text, file_result.description = stored_pages.code, stored_pages.description
+                file_result.code = self.code_text
+            else:
+                started = time.perf_counter()
+                try:
+                    document = fitz.open(self.pdf_path)
+                except Exception as e:
+                    document = None
+                    file_result.error = f"Gagal membuka PDF: {e}"
+                self.timings.add('open', started)
+            if document is not None and stored_pages is None:
+                self.pages_total = document.page_count
+                started = time.perf_counter()
+                self.code_text, file_result.description = self.prescan(document)
+                self.timings.add('prescan', started)
+                file_result.code = self.code_text
+            started = time.perf_counter()
+            file_result.matched_rules = self.rule_index.match(file_result.code)
+            self.timings.add('validate', started)
+            file_result.relevant = bool(file_result.matched_rules) or not self.rule_index
+            self._emit_event('prescan', self.pdf_path, file_result.code, file_result.description, file_result.relevant)
+            if file_result.relevant:
+                _, file_result.results, file_result.error, file_result.pages, file_result.ringkasan = self.run(document)
+        finally:
+            if document is not None:
+                document.close()
+        file_result.stats = self.get_scan_stats()
+        file_result.stats['file_seconds'] = time.perf_counter() - job_started
+        # Teks halaman disimpan ke cache jika ada halaman yang baru dibaca; gagal menyimpan hanya berarti verifikasi
+        # ulang nanti membaca PDF lagi
+        if (keep_page_texts and self.ocr_cache is not None and not file_result.error
+                and (stored_pages is None or len(self.page_text_cache) > len(stored_pages.page_texts))):
+            try:
+                self.ocr_cache.put_page_texts(self.pdf_path, page_text_settings, StoredPageTexts(
+                    file_result.code, file_result.description, self.pages_total, self.page_text_cache,
+                    stored_pages.signature if stored_pages else file_signature(self.pdf_path)))
+            except sqlite3.Error:
+                pass
+        if content_hash:
+            try:
+                file_result.content_hash = self.ocr_cache.file_hash(self.pdf_path) if self.ocr_cache else file_content_hash(self.pdf_path)
+            except OSError:
+                pass
+        return file_result
+
+    def get_scan_stats(self):
+        return {
+            'ocr_calls': self.ocr_calls,
+            'ocr_skipped': self.ocr_skipped,
+            'pages_total': self.pages_total,
+            'pages_untouched': max(0, self.pages_total - len(self.page_text_cache)),
+            'pages_text_layer': self.pages_text_layer,
+            'ocr_cache_hits': self.ocr_cache_hits,
+            'pages_escalated': self.pages_escalated,
+            'region_ocr_calls': self.region_ocr_calls,
+            'region_ocr_hits': self.region_ocr_hits,
+            'pages_reused': self.pages_reused,
+            # Di-OCR spekulatif lalu tidak dipakai karena lintasan sudah berhenti (tidak termasuk pages_untouched)
+            'pages_read_ahead_unused': len(self.read_ahead_pages),
+            'osd_calls': self.timings.counts.get('osd', 0),
+            'stage_seconds': dict(self.timings.seconds),
+            'stage_counts': dict(self.timings.counts),
+            'page_seconds': self.page_seconds,
+        }
+
+def run_pdf_job(job, ocr_cache=None, event_callback=None, should_stop=None, pixmap_slots=None):
+    if job.get('manifest_candidate') is not None:
+        # File yang tidak berubah sejak tercatat di manifest: hasil lama dipakai tanpa membuka PDF
+        file_result = job['manifest_candidate'].cached_result(job['path'])
+        if file_result is not None:
+            return file_result
+    worker = PdfProcessingWorker(job['path'], job['keywords'], job['dpi'], job['rules'], None,
+                                 ocr_cache, event_callback, should_stop, job.get('matcher'), job.get('rule_index'),
+                                 job.get('ocr_batch_pages', OCR_BATCH_PAGES), job.get('max_dpi'), job.get('diagnosis_region'),
+                                 pixmap_slots)
+    run_args = (job.get('reuse_page_texts', False), job.get('keep_page_texts', False), job.get('content_hash', False))
+    if not job.get('profile_dir'):
+        return worker.run_job(*run_args)
+    # Profil cProfile per file; digabung menjadi satu laporan oleh merge_profiles() setelah batch selesai
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ hanya mengizinkan satu profiler aktif; file ini diproses tanpa profil
+        return worker.run_job(*run_args)
+    try:
+        return worker.run_job(*run_args)
+    finally:
+        profiler.disable()
+        profile_name = hashlib.sha1(job['path'].encode('utf-8', 'surrogatepass')).hexdigest()[:16] + ".prof"
+        profiler.dump_stats(os.path.join(job['profile_dir'], profile_name))
+
+# --- Status global proses pool (diisi oleh init_process_worker di setiap proses anak) ---
+_process_ocr_cache = None
+_process_event_queue = None
+_process_stop_event = None
+_process_diagnosis_region = None
+_process_pixmap_slots = None
+
+def init_process_worker(tesseract_cmd, ocr_cache_settings, event_queue=None, stop_event=None, ocr_backend_name=None,
+                        pixmap_semaphore=None):
+    global _process_ocr_cache, _process_event_queue, _process_stop_event, _process_pixmap_slots
+    # Setiap proses anak memegang mesin OCR-nya sendiri (untuk tesserocr: model dimuat sekali per proses)
+    configure_tesseract(tesseract_cmd, ocr_backend_name or 'auto')
+    # Slot pixmap dibagi dengan semua proses anak lain di pool yang sama
+    _process_pixmap_slots = pixmap_semaphore
+    if ocr_cache_settings:
+        _process_ocr_cache = OcrDiskCache(*ocr_cache_settings)
+    _process_event_queue = event_queue
+    _process_stop_event = stop_event
+
+def run_pdf_job_in_process(job):
+    global _process_diagnosis_region
+    if job.get('diagnosis_region') is not None:
+        # Setiap pekerjaan tiba sebagai salinan; area yang dipelajari disimpan per proses agar berlaku untuk file berikutnya
+        if _process_diagnosis_region is None:
+            _process_diagnosis_region = job['diagnosis_region']
+        job = dict(job, diagnosis_region=_process_diagnosis_region)
+    try:
+        return run_pdf_job(job, _process_ocr_cache,
+                           _process_event_queue.put if _process_event_queue else None,
+                           _process_stop_event.is_set if _process_stop_event else None, _process_pixmap_slots)
+    finally:
+        # Proses anak bisa dihentikan tanpa kesempatan menulis; waktu pakai yang tertunda ditulis per file
+        if _process_ocr_cache is not None:
+            _process_ocr_cache.flush()
+
+# --- Memuat Kata Kunci dan Aturan Validasi ---
+DEFAULT_VALIDATION_RULES = [
+    (r"i50.*|i11.0|i13.2|i13.0", "echo|echocardiography"),
+    (r"j44.*", "spirometri"),
+    (r"j13|j14.*|j15.*|j16.*|j17.*|j18.*", "thorax"),
+    (r"g40.*|g41.*", "eeg"),
+    (r"d50.*|d59.*|d62.*|d63.*|d64.*", "transfusi prc")
+]
+
+def _load_string_pairs(file_path, error_message):
+    with open(file_path, 'r') as f:
+        loaded_data = json.load(f)
+    if isinstance(loaded_data, list) and all(isinstance(item, list) and len(item) == 2 and isinstance(item[0], str) and isinstance(item[1], str) for item in loaded_data):
+        return [tuple(item) for item in loaded_data]
+    raise ValueError(error_message)
+
+def load_keywords(file_path):
+    """Memuat pasangan (teks pencarian, teks tampilan). Melempar ValueError/JSONDecodeError jika format salah."""
+    return _load_string_pairs(file_path, "Format file kata kunci tidak valid.")
+
+def load_validation_rules(file_path):
+    """Memuat pasangan (regex kode diagnosa, kata kunci pendukung). Melempar ValueError/JSONDecodeError jika format salah."""
+    return _load_string_pairs(file_path, "Format file aturan validasi tidak valid. Menggunakan aturan default.")
+
+def unique_display_headers(texts_to_find_tuples):
+    ordered_unique_display_texts = []
+    seen_display_texts = set()
+    for _, display_text in texts_to_find_tuples:
+        if display_text not in seen_display_texts:
+            ordered_unique_display_texts.append(display_text)
+        seen_display_texts.add(display_text)
+    return ordered_unique_display_texts
+
+def evaluate_validation(matched_rules, found_page_numbers):
+    """Menyusun status VALIDASI ATURAN. Mengembalikan (teks status, {kata kunci aturan: halaman ditemukan})."""
+    validation_status_list = []
+    rule_keyword_pages = {}
+    for _, must_have_keyword in matched_rules:
+        page_found = found_page_numbers.get(must_have_keyword.upper(), -1)
+        if page_found != -1:
+            validation_status_list.append(f"AMAN (di hlm. {page_found})")
+            rule_keyword_pages[must_have_keyword] = page_found
+        else:
+            validation_status_list.append(f"TIDAK AMAN (harus ada '{must_have_keyword}')")
+    validation_status = ", ".join(validation_status_list) if validation_status_list else "LULUS"
+    return validation_status, rule_keyword_pages
+
+def keyword_page_numbers(file_result, keyword_headers):
+    """Nomor halaman per kolom kata kunci untuk file relevan yang sudah selesai; kata kunci aturan yang sama dengan
+    kolom kata kunci ikut mengisi kolom itu. Kolom yang tidak ditemukan tidak dimuat."""
+    keyword_pages = {display_text: file_result.pages.get(display_text, -1)
+                     for display_text, found in file_result.results.items() if found}
+    _, rule_keyword_pages = evaluate_validation(file_result.matched_rules, file_result.pages)
+    lower_headers = {}
+    for display_text in reversed(keyword_headers):
+        lower_headers[display_text.strip().lower()] = display_text
+    for must_have_keyword, page_found in rule_keyword_pages.items():
+        if must_have_keyword.lower() in lower_headers:
+            keyword_pages[lower_headers[must_have_keyword.lower()]] = page_found
+    return {display_text: page for display_text, page in keyword_pages.items() if page > 0}
+
+def result_row_texts(row_number, file_result, keyword_headers):
+    """Teks sel untuk satu file yang sudah selesai diproses, sama seperti yang tampil di tabel GUI."""
+    row = [str(row_number), os.path.basename(file_result.path), file_result.code, file_result.description]
+    if not file_result.relevant:
+        return row + ["DILEWATI (Kode Diagnosa tidak relevan)", "-"] + ["-"] * len(keyword_headers)
+    validation_status, _ = evaluate_validation(file_result.matched_rules, file_result.pages)
+    keyword_pages = keyword_page_numbers(file_result, keyword_headers)
+    row += [validation_status, "✓" if file_result.ringkasan else "✗"]
+    row += [f"✓ (hal. {keyword_pages[display_text]})" if display_text in keyword_pages else "✗" for display_text in keyword_headers]
+    return row
+
+# --- Menjalankan Banyak Pekerjaan Tanpa Qt (dipakai mode baris perintah) ---
+def iter_job_results(jobs, max_workers, use_processes=False, ocr_cache=None, max_pixmaps=None):
+    """Menjalankan pekerjaan dengan paling banyak max_workers berjalan bersamaan dan menghasilkan hasilnya saat selesai.
+    max_pixmaps membatasi gambar halaman hasil render di semua worker (default max_workers * PIXMAPS_PER_WORKER)."""
+    max_workers = max(1, max_workers)
+    if max_workers > 1:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+    max_pixmaps = max_pixmaps or max_workers * PIXMAPS_PER_WORKER
+    if use_processes:
+        ocr_cache_settings = (ocr_cache.db_path, ocr_cache.max_bytes, ocr_cache.page_text_max_bytes) if ocr_cache else None
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        mp_context = multiprocessing.get_context()
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=init_process_worker,
+                                       initargs=(get_tesseract_cmd(), ocr_cache_settings, None, None, get_ocr_backend_name(),
+                                                 create_pixmap_slots(max_pixmaps, mp_context)))
+        submit = lambda job: executor.submit(run_pdf_job_in_process, job)
+    else:
+        pixmap_slots = create_pixmap_slots(max_pixmaps)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        submit = lambda job: executor.submit(run_pdf_job, job, ocr_cache, None, None, pixmap_slots)
+
+    jobs = iter(jobs)
+    running = {}
+    with executor:
+        for job in jobs:
+            running[submit(job)] = job
+            if len(running) >= max_workers:
+                break
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                try:
+                    file_result = future.result()
+                except Exception as e:
+                    file_result = FileResult(job['path'], relevant=True, error=f"Terjadi kesalahan umum saat memproses PDF: {e}")
+                next_job = next(jobs, None)
+                if next_job is not None:
+                    running[submit(next_job)] = next_job
+                yield file_result
+
+# --- Laporan Waktu Per Batch ---
+def percentile(sorted_values, fraction):
+    """Persentil nearest-rank dari daftar yang sudah terurut, atau None jika kosong."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[index]
+
+class TimingsCollector:
+    """Mengumpulkan waktu per file untuk ringkasan batch. Rincian per file dan per halaman langsung ditulis
+    ke file timings (JSON Lines) sehingga memori tetap kecil pada batch besar."""
+
+    COUNTER_KEYS = ('pages_total', 'pages_untouched', 'pages_text_layer', 'ocr_calls', 'ocr_cache_hits', 'osd_calls',
+                    'pages_escalated', 'region_ocr_calls', 'region_ocr_hits', 'pages_reused', 'pages_read_ahead_unused')
+
+    def __init__(self, timings_path=None, top_count=10):
+        self.timings_file = open(timings_path, 'w', encoding='utf-8') if timings_path else None
+        self.top_count = top_count
+        self.started = time.perf_counter()
+        self.finished = None
+        self.files = 0
+        self.totals = {key: 0 for key in self.COUNTER_KEYS}
+        self.timings = StageTimings()
+        self.ocr_latencies = array('d')
+        self.ocr_latencies_by_dpi = {}
+        self._slowest = []   # min-heap (detik, path) berisi top_count file paling lambat
+
+    def add(self, pdf_path, stats):
+        self.files += 1
+        for key in self.COUNTER_KEYS:
+            self.totals[key] += stats.get(key, 0)
+        stage_counts = stats.get('stage_counts', {})
+        for stage, seconds in stats.get('stage_seconds', {}).items():
+            self.timings.add_seconds(stage, seconds, stage_counts.get(stage, 1))
+        for _, source, seconds, dpi in stats.get('page_seconds', ()):
+            if source == 'ocr':
+                self.ocr_latencies.append(seconds)
+                self.ocr_latencies_by_dpi.setdefault(dpi, array('d')).append(seconds)
+        file_seconds = stats.get('file_seconds', 0.0)
+        if len(self._slowest) < self.top_count:
+            heapq.heappush(self._slowest, (file_seconds, pdf_path))
+        elif file_seconds > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, (file_seconds, pdf_path))
+        if self.timings_file:
+            self.timings_file.write(json.dumps(dict(stats, type='file', path=pdf_path), ensure_ascii=False) + "\n")
+
+    def add_stage(self, stage, seconds):
+        """Tahap yang diukur di luar worker, misalnya 'export' atau 'ui'."""
+        self.timings.add_seconds(stage, seconds)
+
+    def summary(self):
+        latencies = sorted(self.ocr_latencies)
+        wall_seconds = (self.finished or time.perf_counter()) - self.started
+        return dict(self.totals, **{
+            'files': self.files,
+            'wall_seconds': wall_seconds,
+            'ocr_latency_p50': percentile(latencies, 0.50),
+            'ocr_latency_p95': percentile(latencies, 0.95),
+            'ocr_latency_by_dpi': {dpi: {'pages': len(values), 'p50': percentile(sorted(values), 0.50),
+                                         'p95': percentile(sorted(values), 0.95)}
+                                   for dpi, values in sorted(self.ocr_latencies_by_dpi.items())},
+            'stage_seconds': {stage: self.timings.seconds.get(stage, 0.0) for stage in STAGES},
+            'stage_counts': {stage: self.timings.counts.get(stage, 0) for stage in STAGES},
+            'slowest_files': [[path, seconds] for seconds, path in sorted(self._slowest, reverse=True)],
+        })
+
+    def summary_lines(self):
+        summary = self.summary()
+        lines = [
+            f"File: {summary['files']} dalam {summary['wall_seconds']:.1f} detik | Halaman: {summary['pages_total']} "
+            f"(lapisan teks {summary['pages_text_layer']}, OCR {summary['ocr_calls']}, cache OCR {summary['ocr_cache_hits']}, "
+            f"tidak disentuh {summary['pages_untouched']}) | OSD: {summary['osd_calls']}",
+        ]
+        if summary['ocr_latency_p50'] is None:
+            lines.append("Latensi OCR per halaman: - (tidak ada halaman yang di-OCR)")
+        else:
+            lines.append(f"Latensi OCR per halaman: p50 {summary['ocr_latency_p50']:.2f} detik, p95 {summary['ocr_latency_p95']:.2f} detik")
+        if summary['region_ocr_calls']:
+            lines.append(f"OCR area diagnosa halaman 1: {summary['region_ocr_calls']} file, "
+                         f"{summary['region_ocr_hits']} cukup tanpa OCR halaman penuh")
+        if summary['pages_reused']:
+            lines.append(f"Verifikasi ulang: {summary['pages_reused']} halaman dipakai dari teks tersimpan tanpa dibaca ulang")
+        if summary['pages_read_ahead_unused']:
+            lines.append(f"Read-ahead OCR: {summary['pages_read_ahead_unused']} halaman di-OCR tetapi tidak dipakai "
+                         f"(lintasan sudah berhenti sebelum halaman itu)")
+        if summary['pages_escalated']:
+            lines.append(f"DPI adaptif: {summary['pages_escalated']} halaman di-OCR ulang pada DPI tinggi")
+            for dpi, latency in summary['ocr_latency_by_dpi'].items():
+                lines.append(f"  {dpi} DPI: {latency['pages']} halaman, p50 {latency['p50']:.2f} detik, p95 {latency['p95']:.2f} detik")
+        lines.append("Waktu per tahap (dijumlah dari semua worker):")
+        for stage in STAGES:
+            if summary['stage_counts'][stage]:
+                lines.append(f"  {stage:<9} {summary['stage_seconds'][stage]:9.3f} detik  ({summary['stage_counts'][stage]}x)")
+        if summary['slowest_files']:
+            lines.append("File paling lambat:")
+            for path, seconds in summary['slowest_files']:
+                lines.append(f"  {seconds:8.2f} detik  {path}")
+        return lines
+
+    def close(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+        if self.timings_file:
+            self.timings_file.write(json.dumps(dict(self.summary(), type='summary'), ensure_ascii=False) + "\n")
+            self.timings_file.close()
+            self.timings_file = None
+
+def merge_profiles(profile_dir, output_path, top_count=40):
+    """Menggabungkan profil cProfile per file menjadi satu file .prof dan ringkasan teks (output_path + '.txt')."""
+    profile_paths = [os.path.join(profile_dir, name) for name in os.listdir(profile_dir) if name.endswith(".prof")]
+    if not profile_paths:
+        return False
+    import pstats
+    stats = pstats.Stats(*profile_paths)
+    stats.dump_stats(output_path)
+    with open(output_path + ".txt", 'w', encoding='utf-8') as f:
+        stats.stream = f
+        stats.sort_stats('cumulative').print_stats(top_count)
+    return True
@@ -0,0 +1,250 @@
+"""Penulis hasil verifikasi ke file tanpa ketergantungan pada PyQt.
+
+.xlsx berisi teks sel seperti tabel GUI; .csv, .jsonl dan .parquet berisi satu rekaman bertipe per file
+(kode, status, nomor halaman, waktu) untuk analitik. Semua penulis menerima hasil satu per satu (write)
+sehingga hasil bisa dialirkan langsung dari worker tanpa menahan seluruh batch di memori. Dipakai oleh
+GUI, mode baris perintah dan benchmark.
+"""
+import os
+import re
+import csv
+import json
+import shutil
+import zipfile
+
+from verifikasi_engine import RESULT_HEADERS, STAGES, evaluate_validation, keyword_page_numbers
+
+XLSX_SHEET_TITLE = "Hasil Verifikasi"
+XLSX_MAX_COLUMN_WIDTH = 80
+XLSX_SHEET_PATH = "xl/worksheets/sheet1.xml"
+XLSX_SHEET_HEAD_BYTES = 64 * 1024     # <cols> selalu ada di awal sheet, sebelum <sheetData>
+PARQUET_ROW_GROUP_SIZE = 10000
+
+def text_width(text):
+    """Lebar kolom Excel untuk satu teks: panjang baris terpanjangnya."""
+    return max((len(line) for line in str(text).split('\n')), default=0)
+
+def rollover_path(path):
+    """Nama file lanjutan yang belum ada: Hasil_Verifikasi.xlsx -> Hasil_Verifikasi_2.xlsx, _3, dst."""
+    base, extension = os.path.splitext(path)
+    number = 2
+    while os.path.exists(f"{base}_{number}{extension}"):
+        number += 1
+    return f"{base}_{number}{extension}"
+
+# --- Penulis Hasil (format dipilih dari ekstensi file) ---
+class XlsxResultWriter:
+    """Workbook write-only: baris langsung dialirkan ke file, jadi memori tidak bertambah dengan jumlah baris.
+
+    openpyxl menulis lebar kolom sebelum baris pertama. Jika column_widths sudah diketahui (mis. nilai maksimum
+    berjalan di tabel GUI) lebar itu dipakai langsung; jika tidak, nilai maksimum berjalan dihitung selama write()
+    dan elemen <cols> di sheet ditulis ulang saat close().
+    """
+
+    def __init__(self, path, headers, column_widths=None):
+        from openpyxl import Workbook
+        from openpyxl.styles import Font, PatternFill, Alignment, Side, Border
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.utils import get_column_letter
+        self.path = path
+        self.WriteOnlyCell = WriteOnlyCell
+        self.wrap_alignment = Alignment(wrap_text=True)
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet(XLSX_SHEET_TITLE)
+        header_texts = [header.replace('\n', ' ') for header in headers]
+        # None = lebar diukur dari baris yang ditulis (nilai maksimum berjalan) dan diterapkan saat close()
+        self.running_widths = None
+        if column_widths is None:
+            column_widths = [text_width(header) for header in header_texts]
+            self.running_widths = list(column_widths)
+        for column, width in enumerate(column_widths, 1):
+            self.ws.column_dimensions[get_column_letter(column)].width = min(width, XLSX_MAX_COLUMN_WIDTH) + 2
+
+        thin_side = Side(style='thin', color='000000')
+        header_font = Font(bold=True, color="000000")
+        header_fill = PatternFill(start_color="FFFFFF", end_color="FFFFFF", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        header_border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
+        header_cells = []
+        for header in header_texts:
+            cell = WriteOnlyCell(self.ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            cell.border = header_border
+            header_cells.append(cell)
+        self.ws.append(header_cells)
+
+    def write(self, row_texts, file_result):
+        row = []
+        running_widths = self.running_widths
+        for column, text in enumerate(row_texts):
+            if running_widths is not None and column < len(running_widths):
+                width = text_width(text)
+                if width > running_widths[column]:
+                    running_widths[column] = width
+            if '\n' in text:
+                cell = self.WriteOnlyCell(self.ws, value=text)
+                cell.alignment = self.wrap_alignment
+                row.append(cell)
+            else:
+                row.append(text)
+        self.ws.append(row)
+
+    def close(self):
+        self.wb.save(self.path)
+        if self.running_widths is not None:
+            self._rewrite_column_widths()
+
+    def _rewrite_column_widths(self):
+        # Salin arsip sekali; hanya awal sheet1.xml (tempat <cols>) yang diubah, sisanya dialirkan apa adanya
+        cols_xml = "<cols>" + "".join(
+            f'<col width="{min(width, XLSX_MAX_COLUMN_WIDTH) + 2}" customWidth="1" min="{column}" max="{column}" />'
+            for column, width in enumerate(self.running_widths, 1)) + "</cols>"
+        temp_path = self.path + ".tmp"
+        try:
+            with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED) as target:
+                for info in source.infolist():
+                    with source.open(info) as source_file, target.open(info, 'w') as target_file:
+                        if info.filename == XLSX_SHEET_PATH:
+                            head = source_file.read(XLSX_SHEET_HEAD_BYTES)
+                            target_file.write(re.sub(rb'<cols>.*?</cols>', cols_xml.encode('utf-8'), head, count=1, flags=re.DOTALL))
+                        shutil.copyfileobj(source_file, target_file, 1024 * 1024)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+# --- Rekaman Bertipe (satu per file) untuk Analitik ---
+# Tahap yang diukur worker per file; 'export' dan 'ui' diukur per batch oleh pemanggil
+FILE_STAGES = tuple(stage for stage in STAGES if stage not in ('export', 'ui'))
+STAT_COLUMNS = ('pages_total', 'pages_text_layer', 'ocr_calls', 'ocr_cache_hits', 'osd_calls', 'pages_escalated')
+
+def result_status(file_result):
+    """Status validasi sebagai kode: GAGAL, DILEWATI, LULUS (tidak ada aturan), AMAN atau TIDAK AMAN."""
+    if file_result.error:
+        return 'GAGAL'
+    if not file_result.relevant:
+        return 'DILEWATI'
+    if not file_result.matched_rules:
+        return 'LULUS'
+    _, rule_keyword_pages = evaluate_validation(file_result.matched_rules, file_result.pages)
+    return 'AMAN' if len(rule_keyword_pages) == len(file_result.matched_rules) else 'TIDAK AMAN'
+
+def typed_result_record(file_result, keyword_headers):
+    """Rekaman bertipe satu file: nomor halaman sebagai bilangan (None jika tidak ditemukan), bukan teks sel
+    seperti "✓ (hal. 12)", sehingga tidak perlu diurai ulang."""
+    relevant = file_result.relevant
+    keyword_pages = keyword_page_numbers(file_result, keyword_headers) if relevant else {}
+    rules = []
+    for pattern, must_have_keyword in file_result.matched_rules if relevant else ():
+        page_found = file_result.pages.get(must_have_keyword.upper(), -1)
+        rules.append({'pattern': pattern, 'keyword': must_have_keyword, 'page': page_found if page_found > 0 else None})
+    stats = file_result.stats
+    stage_seconds = stats.get('stage_seconds', {})
+    return {
+        'path': file_result.path,
+        'file_name': os.path.basename(file_result.path),
+        'code': file_result.code,
+        'description': file_result.description,
+        'relevant': relevant,
+        'status': result_status(file_result),
+        'ringkasan': file_result.ringkasan if relevant else None,
+        'error': file_result.error or None,
+        'rules': rules,
+        'keyword_pages': {header: keyword_pages.get(header) for header in keyword_headers},
+        'file_seconds': stats.get('file_seconds'),
+        'stats': {key: stats.get(key, 0) for key in STAT_COLUMNS},
+        'stage_seconds': {stage: stage_seconds.get(stage, 0.0) for stage in FILE_STAGES},
+    }
+
+def flat_result_columns(keyword_headers):
+    """Nama kolom untuk format datar (CSV, Parquet), sesuai urutan flat_result_values()."""
+    return (['path', 'file_name', 'code', 'description', 'relevant', 'status', 'ringkasan', 'error', 'rules']
+            + [f"hal_{header.replace(chr(10), ' ')}" for header in keyword_headers]
+            + ['file_seconds'] + list(STAT_COLUMNS) + [f"seconds_{stage}" for stage in FILE_STAGES])
+
+def flat_result_values(record):
+    return ([record[key] for key in ('path', 'file_name', 'code', 'description', 'relevant', 'status', 'ringkasan', 'error', 'rules')]
+            + list(record['keyword_pages'].values())
+            + [record['file_seconds']] + list(record['stats'].values()) + list(record['stage_seconds'].values()))
+
+class CsvResultWriter:
+    """Satu baris bertipe per file. Kolom 'rules' berisi JSON; nomor halaman kosong jika tidak ditemukan."""
+
+    def __init__(self, path, headers, column_widths=None):
+        self.path = path
+        self.keyword_headers = headers[len(RESULT_HEADERS):]
+        # utf-8-sig agar teks non-ASCII terbaca benar saat dibuka di Excel
+        self.file = open(path, 'w', newline='', encoding='utf-8-sig')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(flat_result_columns(self.keyword_headers))
+
+    def write(self, row_texts, file_result):
+        record = typed_result_record(file_result, self.keyword_headers)
+        record['rules'] = json.dumps(record['rules'], ensure_ascii=False)
+        self.writer.writerow(['' if value is None else value for value in flat_result_values(record)])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class JsonlResultWriter:
+    def __init__(self, path, headers, column_widths=None):
+        self.path = path
+        self.file = open(path, 'w', encoding='utf-8')
+        self.keyword_headers = headers[len(RESULT_HEADERS):]
+
+    def write(self, row_texts, file_result):
+        record = typed_result_record(file_result, self.keyword_headers)
+        self.file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class ParquetResultWriter:
+    """File kolumnar (memerlukan pyarrow). Rekaman ditampung lalu ditulis sebagai row group setiap
+    PARQUET_ROW_GROUP_SIZE file, jadi memori tetap kecil pada batch besar."""
+
+    def __init__(self, path, headers, column_widths=None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ValueError("Format .parquet memerlukan pyarrow. Instal dengan 'pip install pyarrow'.")
+        self.pa = pyarrow
+        self.path = path
+        self.keyword_headers = headers[len(RESULT_HEADERS):]
+        rule_type = pyarrow.list_(pyarrow.struct([('pattern', pyarrow.string()), ('keyword', pyarrow.string()),
+                                                  ('page', pyarrow.int32())]))
+        column_types = ([pyarrow.string()] * 4 + [pyarrow.bool_(), pyarrow.string(), pyarrow.bool_(), pyarrow.string(), rule_type]
+                        + [pyarrow.int32()] * len(self.keyword_headers)
+                        + [pyarrow.float64()] + [pyarrow.int32()] * len(STAT_COLUMNS) + [pyarrow.float64()] * len(FILE_STAGES))
+        self.schema = pyarrow.schema(list(zip(flat_result_columns(self.keyword_headers), column_types)))
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+        self.columns = [[] for _ in self.schema]
+
+    def write(self, row_texts, file_result):
+        for column, value in zip(self.columns, flat_result_values(typed_result_record(file_result, self.keyword_headers))):
+            column.append(value)
+        if len(self.columns[0]) >= PARQUET_ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if self.columns[0]:
+            self.writer.write_table(self.pa.Table.from_arrays(self.columns, schema=self.schema))
+            self.columns = [[] for _ in self.schema]
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+RESULT_WRITERS = {'.xlsx': XlsxResultWriter, '.csv': CsvResultWriter, '.jsonl': JsonlResultWriter,
+                  '.parquet': ParquetResultWriter}
+
+def open_result_writer(path, headers, column_widths=None):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in RESULT_WRITERS:
+        raise ValueError(f"Format keluaran tidak dikenal untuk '{path}'. Gunakan {', '.join(RESULT_WRITERS)}.")
+    return RESULT_WRITERS[extension](path, headers, column_widths)